@@ -7,3 +7,8 @@ ADMIN_ROLE = "admin"
 ACCESS_TOKEN = "access"
 RESET_TOKEN = "reset"
 VERIFICATION_TOKEN = "verification"
+
+EXPORT_PENDING = "pending"
+EXPORT_RUNNING = "running"
+EXPORT_DONE = "done"
+EXPORT_FAILED = "failed"
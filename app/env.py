@@ -7,6 +7,32 @@ db_name = "KDB"
 SECRET_KEY = "supersecretkey123"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 180
+REVOKED_TOKENS_SYNC_SECONDS = int(os.getenv("REVOKED_TOKENS_SYNC_SECONDS", "5"))
+REVOKED_TOKENS_PURGE_SECONDS = int(os.getenv("REVOKED_TOKENS_PURGE_SECONDS", "3600"))
+# store sha256 digests instead of raw JWTs in revoked_tokens.token
+REVOKED_TOKENS_STORE_DIGEST = os.getenv("REVOKED_TOKENS_STORE_DIGEST", "0") == "1"
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "1024"))
+TOKEN_CLAIMS_CACHE_SIZE = int(os.getenv("TOKEN_CLAIMS_CACHE_SIZE", "4096"))
+# "dense" shifts sibling positions on every move, "gap" writes only the moved task
+TASK_ORDERING = os.getenv("TASK_ORDERING", "dense")
+TASK_POSITION_GAP = int(os.getenv("TASK_POSITION_GAP", "1024"))
+EXPORT_CACHE_ENABLED = os.getenv("EXPORT_CACHE_ENABLED", "1") == "1"
+# draw short PDF table cells as plain strings instead of Paragraphs
+PDF_FAST_TABLES = os.getenv("PDF_FAST_TABLES", "1") == "1"
+# render PDFs board by board from a streaming query instead of loading the whole project
+PDF_STREAMING = os.getenv("PDF_STREAMING", "1") == "1"
+# bcrypt runs on its own pool; callers beyond PASSWORD_HASH_MAX_PENDING get a 429
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+EXPORT_JOB_MAX_PENDING = int(os.getenv("EXPORT_JOB_MAX_PENDING", "32"))
+# export jobs and their result objects are deleted after this many hours
+EXPORT_JOB_TTL_HOURS = int(os.getenv("EXPORT_JOB_TTL_HOURS", "24"))
+EXPORT_JOB_PURGE_SECONDS = int(os.getenv("EXPORT_JOB_PURGE_SECONDS", "3600"))
+# resized profile-picture variants, generated at upload and stored next to the original
+AVATAR_SIZES = tuple(int(size) for size in os.getenv("AVATAR_SIZES", "32,64,256").split(","))
+AVATAR_FORMAT = os.getenv("AVATAR_FORMAT", "WEBP").upper()
 
 
 MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "localhost:9000") #Windows version
@@ -14,4 +40,19 @@ MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "localhost:9000") #Windows version
 
 MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY", "minioadmin")
 MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY", "minioadmin")
-MINIO_SECURE = False
\ No newline at end of file
+MINIO_SECURE = False
+# threads running blocking MinIO calls; also the size of the HTTP connection pool by default
+MINIO_MAX_WORKERS = int(os.getenv("MINIO_MAX_WORKERS", "16"))
+MINIO_POOL_SIZE = int(os.getenv("MINIO_POOL_SIZE", str(MINIO_MAX_WORKERS)))
+MINIO_TIMEOUT_SECONDS = float(os.getenv("MINIO_TIMEOUT_SECONDS", "30"))
+# uploads larger than this go to MinIO as multipart in parts of this size (S3 minimum is 5 MiB)
+MINIO_PART_SIZE = int(os.getenv("MINIO_PART_SIZE", str(10 * 1024 * 1024)))
+# upper bound of the backoff between startup attempts to reach the database and MinIO
+STARTUP_RETRY_MAX_SECONDS = float(os.getenv("STARTUP_RETRY_MAX_SECONDS", "30"))
+AVATAR_MAX_BYTES = int(os.getenv("AVATAR_MAX_BYTES", str(5 * 1024 * 1024)))
+# redirect avatar requests to presigned MinIO URLs instead of proxying the bytes
+AVATAR_PRESIGNED_REDIRECT = os.getenv("AVATAR_PRESIGNED_REDIRECT", "0") == "1"
+AVATAR_PRESIGNED_TTL_SECONDS = int(os.getenv("AVATAR_PRESIGNED_TTL_SECONDS", str(24 * 3600)))
+# host browsers use to reach MinIO, presigned URLs are signed for it
+MINIO_PUBLIC_ENDPOINT = os.getenv("MINIO_PUBLIC_ENDPOINT", MINIO_ENDPOINT)
+MINIO_REGION = os.getenv("MINIO_REGION", "us-east-1")
\ No newline at end of file
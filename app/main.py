@@ -1,12 +1,129 @@
-from fastapi import FastAPI
-from app.db.database import engine, Base
+import asyncio
+import contextlib
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.db.database import engine, async_engine, Base, SessionLocal
 from app.routes import user_routes, auth_routes, column_routes, board_routes, task_routes ,picture_routes
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import projects_routes
+from app.routes import projects_routes, internal_routes, export_routes
+from app.services.token_cache import revoked_tokens, purge_expired_tokens
+from app.services.export_jobs import shutdown_export_pool, purge_expired_export_jobs
+from app.services.minio_client import ensure_bucket, shutdown_minio_pool
+from app.services.password_service import password_hasher
+from app.services.readiness import readiness
+from app.env import REVOKED_TOKENS_PURGE_SECONDS, STARTUP_RETRY_MAX_SECONDS, EXPORT_JOB_PURGE_SECONDS
 
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Kanban Management API")
+# served before the database is ready
+READINESS_EXEMPT_PATHS = {"/health", "/docs", "/redoc", "/openapi.json"}
+
+
+def _load_revoked_tokens():
+    db = SessionLocal()
+    try:
+        revoked_tokens.load(db)
+    finally:
+        db.close()
+
+
+def _purge_revoked_tokens():
+    db = SessionLocal()
+    try:
+        return purge_expired_tokens(db)
+    finally:
+        db.close()
+
+
+def _init_database():
+    Base.metadata.create_all(bind=engine)
+    # Warm the revoked-token cache so verify_token_claims does not hit the database per request
+    _load_revoked_tokens()
+
+
+async def _init_with_retries(name: str, init):
+    delay = 1.0
+    while True:
+        try:
+            await asyncio.to_thread(init)
+        except Exception as e:
+            logger.warning("%s is not available yet (%s), retrying in %.0f s", name, e, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, STARTUP_RETRY_MAX_SECONDS)
+            continue
+        readiness[name] = True
+        logger.info("%s ready", name)
+        return
+
+
+async def initialize():
+    await asyncio.gather(
+        _init_with_retries("database", _init_database),
+        _init_with_retries("storage", ensure_bucket),
+    )
+
+
+async def revoked_tokens_reaper():
+    while True:
+        await asyncio.sleep(REVOKED_TOKENS_PURGE_SECONDS)
+        try:
+            deleted = await asyncio.to_thread(_purge_revoked_tokens)
+            if deleted:
+                logger.info("Purged %s expired revoked tokens", deleted)
+        except Exception:
+            logger.exception("Failed to purge expired revoked tokens")
+
+
+async def export_jobs_reaper():
+    while True:
+        await asyncio.sleep(EXPORT_JOB_PURGE_SECONDS)
+        try:
+            deleted = await asyncio.to_thread(purge_expired_export_jobs)
+            if deleted:
+                logger.info("Purged %s expired export jobs", deleted)
+        except Exception:
+            logger.exception("Failed to purge expired export jobs")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The database and MinIO are set up in the background so the worker starts immediately
+    init = asyncio.create_task(initialize())
+    reaper = asyncio.create_task(revoked_tokens_reaper())
+    export_reaper = asyncio.create_task(export_jobs_reaper())
+    yield
+    for task in (init, reaper, export_reaper):
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    shutdown_export_pool()
+    shutdown_minio_pool()
+    password_hasher.shutdown()
+    await async_engine.dispose()
+
+
+app = FastAPI(title="Kanban Management API", lifespan=lifespan)
+
+
+# Registered before CORS so the 503 responses still carry the CORS headers
+@app.middleware("http")
+async def require_ready(request: Request, call_next):
+    # Only the database gates every request; routes that need MinIO depend on require_storage
+    if not readiness["database"] and request.url.path not in READINESS_EXEMPT_PATHS:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Service is starting, try again shortly"},
+            headers={"Retry-After": "1"},
+        )
+    return await call_next(request)
+
+
+@app.get("/health", tags=["Health"])
+async def health():
+    ready = all(readiness.values())
+    return JSONResponse(status_code=200 if ready else 503, content={"ready": ready, **readiness})
 
 origins = [
     "http://localhost:3000",
@@ -19,6 +136,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 app.include_router(user_routes.router, prefix="/users", tags=["Users"])
@@ -28,3 +146,5 @@ app.include_router(board_routes.router, prefix="/boards", tags=["Boards"])
 app.include_router(column_routes.router, prefix="/columns", tags=["Columns"])
 app.include_router(projects_routes.router, prefix="/projects", tags=["Projects"])
 app.include_router(task_routes.router, prefix="/tasks", tags=["Tasks"])
+app.include_router(export_routes.router, prefix="/exports", tags=["Exports"])
+app.include_router(internal_routes.router, prefix="/internal", tags=["Internal"])
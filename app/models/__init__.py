@@ -0,0 +1,11 @@
+# Importing the package registers every mapped table on Base.metadata, so foreign keys and
+# relationships resolve in processes that only need a few of the models (export workers).
+from app.models.user import User
+from app.models.token import Token
+from app.models.project import Project
+from app.models.board import Board
+from app.models.column import ColumnModel
+from app.models.task import Task
+from app.models.export_job import ExportJob
+
+__all__ = ["User", "Token", "Project", "Board", "ColumnModel", "Task", "ExportJob"]
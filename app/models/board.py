@@ -13,7 +13,7 @@ class Board(Base):
     description = Column(String, nullable=True)
     color = Column(String(50))
 
-    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.public_project_id"), nullable=False)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.public_project_id"), nullable=False, index=True)
 
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
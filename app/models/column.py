@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.db.database import Base
@@ -9,10 +9,16 @@ class ColumnModel(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     position = Column(Integer, nullable=False, default=0)  
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                        onupdate=lambda: datetime.now(timezone.utc))
 
     # Link to Board
     board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False)
 
+    __table_args__ = (
+        Index("ix_columns_board_id_position", "board_id", "position"),
+    )
+
     # Relationship with Board
     board = relationship("Board", back_populates="columns")
     tasks = relationship("Task", back_populates="column", cascade="all, delete-orphan")
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Text, BigInteger, TIMESTAMP, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.db.database import Base
+from app.constant import EXPORT_PENDING
+import uuid
+
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+
+    job_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
+    project_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("projects.public_project_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    board_id = Column(Integer, nullable=True)
+    format = Column(String(20), nullable=False)
+
+    status = Column(String(20), nullable=False, default=EXPORT_PENDING)
+    object_name = Column(Text)
+    size = Column(BigInteger)
+    error = Column(Text)
+
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    finished_at = Column(TIMESTAMP)
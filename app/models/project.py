@@ -26,6 +26,7 @@ class Project(Base):
         UUID(as_uuid=True),
         ForeignKey("users.user_id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
 
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, func, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, func, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.db.database import Base
@@ -20,5 +20,12 @@ class Task(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # column task listing and position shifts filter on column_id and range over position
+        Index("ix_tasks_column_id_position", "column_id", "position"),
+        # keyset pagination of /tasks/getall ordered by (due_date, id)
+        Index("ix_tasks_due_date_id", "due_date", "id"),
+    )
+
     # Relationship 
     column = relationship("ColumnModel", back_populates="tasks")
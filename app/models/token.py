@@ -5,6 +5,7 @@ from app.db.database import Base
 
 class Token(Base):
     __tablename__ = "revoked_tokens"
+    # raw JWT, or its 64-char sha256 hex digest when REVOKED_TOKENS_STORE_DIGEST is on
     token = Column(String(255), primary_key=True)
     revoked_at = Column(TIMESTAMP, server_default=func.now())
-    valid_until = Column(TIMESTAMP, nullable=False)
+    valid_until = Column(TIMESTAMP, nullable=False, index=True)
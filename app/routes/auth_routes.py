@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.models.user import User
-from app.utils import verify_password, hash_password, generate_token
-from app.services.jwt_service import create_token
+from app.utils import generate_token
+from app.services.password_service import hash_password_async, verify_password_async
+from app.services.jwt_service import create_token, invalidate_user
 from app.schemas.user_schema import UserCreate, UserOut
 from app.constant import ACTIVE, DELETED
 
@@ -12,13 +14,13 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=UserOut)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.scalar(select(User).filter(User.email == user.email))
 
     if db_user and db_user.status != DELETED:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = hash_password(user.password)
+    hashed_password = await hash_password_async(user.password)
     verification_token = generate_token()
 
     if db_user and db_user.status == DELETED:
@@ -28,8 +30,9 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
         db_user.surname = user.surname
         db_user.verification_token = verification_token
         db_user.status = ACTIVE
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+        invalidate_user(db_user.user_id)
         return db_user
 
     new_user = User(
@@ -41,16 +44,16 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
         verification_token=verification_token
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 
 @router.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == form_data.username).first()
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).filter(User.username == form_data.username))
 
-    if not user or user.status == DELETED or not verify_password(form_data.password, user.password_hash):
+    if not user or user.status == DELETED or not await verify_password_async(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
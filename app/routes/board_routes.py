@@ -1,27 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.models.board import Board
+from app.models.column import ColumnModel
 from app.models.project import Project
-from app.schemas.board_schema import BoardCreate, BoardOut, BoardUpdate
+from app.models.task import Task
+from app.schemas.board_schema import BoardCreate, BoardOut, BoardUpdate, BoardSnapshot
 from app.services.jwt_service import get_current_user
+from app.services.etag_service import make_etag, etag_matches, not_modified, set_etag
 
 router = APIRouter()
 
 
 # CREATE a board under a project (using public_project_id)
 @router.post("/create/project/{public_project_id}")
-def create_board(
+async def create_board(
     public_project_id: UUID,
     board: BoardCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_user)
 ):
-    project = (
-        db.query(Project)
+    project = await db.scalar(
+        select(Project)
         .filter(Project.public_project_id == public_project_id, Project.owner_id == current_user.user_id)
-        .first()
     )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found or access denied")
@@ -33,40 +36,94 @@ def create_board(
         project_id=project.public_project_id
     )
     db.add(new_board)
-    db.commit()
-    db.refresh(new_board)
+    await db.commit()
+    await db.refresh(new_board)
     return new_board
 
 # GET all boards for a project
 @router.get("/project/{public_project_id}")
-def get_boards_for_project(
+async def get_boards_for_project(
     public_project_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_user)
 ):
-    project = (
-        db.query(Project)
+    project = await db.scalar(
+        select(Project)
         .filter(Project.public_project_id == public_project_id, Project.owner_id == current_user.user_id)
-        .first()
     )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    
-    boards = db.query(Board).filter(Board.project_id == project.public_project_id).all()
+
+    count, last_modified = (await db.execute(
+        select(func.count(Board.id), func.max(Board.updated_at))
+        .filter(Board.project_id == project.public_project_id)
+    )).one()
+    etag = make_etag("boards", public_project_id, count, last_modified)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    boards = (await db.scalars(select(Board).filter(Board.project_id == project.public_project_id))).all()
     return boards
 
+# GET a board with its ordered columns and tasks in one round trip
+@router.get("/{board_id}/snapshot", response_model=BoardSnapshot)
+async def get_board_snapshot(
+    board_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user)
+):
+    board = await db.scalar(
+        select(Board)
+        .join(Project)
+        .filter(Board.id == board_id, Project.owner_id == current_user.user_id)
+    )
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found or access denied")
+
+    # Ownership is checked above, so columns and tasks come from a single join without the project table
+    rows = (await db.execute(
+        select(ColumnModel, Task)
+        .outerjoin(Task, Task.column_id == ColumnModel.id)
+        .filter(ColumnModel.board_id == board_id)
+        .order_by(ColumnModel.position, Task.position)
+    )).all()
+
+    columns = {}
+    for column, task in rows:
+        entry = columns.get(column.id)
+        if entry is None:
+            entry = columns[column.id] = {
+                "id": column.id,
+                "name": column.name,
+                "position": column.position,
+                "board_id": column.board_id,
+                "tasks": [],
+            }
+        if task is not None:
+            entry["tasks"].append(task)
+
+    return {
+        "id": board.id,
+        "name": board.name,
+        "description": board.description,
+        "color": board.color,
+        "columns": list(columns.values()),
+    }
+
 @router.put("/update/{boardId}", response_model=BoardOut)
-def update_board(
-    boardId: str,
+async def update_board(
+    boardId: int,
     board_update: BoardUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_user),
 ):
     # Fetch the board, optionally check owner if needed
-    board = (
-        db.query(Board)
+    board = await db.scalar(
+        select(Board)
         .filter(Board.id == boardId)
-        .first()
     )
     if not board:
         raise HTTPException(status_code=404, detail="Board not found or access denied")
@@ -79,33 +136,33 @@ def update_board(
     if board_update.color is not None:
         board.color = board_update.color
 
-    db.commit()
-    db.refresh(board)
+    await db.commit()
+    await db.refresh(board)
     return board
 
 @router.delete("/{board_id}/project/{public_project_id}")
-def delete_board(
+async def delete_board(
     board_id: int,
     public_project_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_user)
 ):
-    project = db.query(Project).filter(
+    project = await db.scalar(select(Project).filter(
         Project.public_project_id == public_project_id,
         Project.owner_id == current_user.user_id
-    ).first()
+    ))
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found or access denied")
 
-    board = db.query(Board).filter(
+    board = await db.scalar(select(Board).filter(
         Board.id == board_id,
         Board.project_id == project.public_project_id
-    ).first()
+    ))
 
     if not board:
         raise HTTPException(status_code=404, detail="Board not found or access denied")
 
-    db.delete(board)
-    db.commit()
+    await db.delete(board)
+    await db.commit()
     return {"message": "Board deleted successfully"}
@@ -1,32 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
 from app.models.column import ColumnModel
 from app.models.board import Board
 from app.models.project import Project
 from app.schemas.column_schema import ColumnCreate, ColumnOut, ColumnReorder
 from typing import List
 from app.services.jwt_service import get_current_user
+from app.services.etag_service import make_etag, etag_matches, not_modified, set_etag
 
 router = APIRouter()
 
 # Create a column in a board
 @router.post("/create", response_model=ColumnOut)
-def create_column(column: ColumnCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    board = (
-        db.query(Board)
+async def create_column(column: ColumnCreate, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
+    board = await db.scalar(
+        select(Board)
         .join(Project)
         .filter(Board.id == column.board_id, Project.owner_id == current_user.user_id)
-        .first()
     )
     if not board:
         raise HTTPException(status_code=404, detail="Board not found or access denied")
 
     # Calculate the next position automatically
-    max_position = db.query(func.max(ColumnModel.position))\
-        .filter(ColumnModel.board_id == column.board_id)\
-        .scalar() or 0
+    max_position = await db.scalar(
+        select(func.max(ColumnModel.position))
+        .filter(ColumnModel.board_id == column.board_id)
+    ) or 0
 
     new_column = ColumnModel(
         name=column.name,
@@ -34,32 +35,41 @@ def create_column(column: ColumnCreate, db: Session = Depends(get_db), current_u
         board_id=column.board_id
     )
     db.add(new_column)
-    db.commit()
-    db.refresh(new_column)
+    await db.commit()
+    await db.refresh(new_column)
     return new_column
 
 # Get all the column of that board
 @router.get("/{board_id}", response_model=List[ColumnOut])
-def get_columns_for_board(board_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    columns = (
-        db.query(ColumnModel)
+async def get_columns_for_board(board_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
+    count, last_modified = (await db.execute(
+        select(func.count(ColumnModel.id), func.max(ColumnModel.updated_at))
+        .join(Board)
+        .join(Project)
+        .filter(ColumnModel.board_id == board_id, Project.owner_id == current_user.user_id)
+    )).one()
+    etag = make_etag("columns", board_id, count, last_modified)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    columns = (await db.scalars(
+        select(ColumnModel)
         .join(Board)
         .join(Project)
         .filter(ColumnModel.board_id == board_id, Project.owner_id == current_user.user_id)
         .order_by(ColumnModel.position)  
-        .all()
-    )
+    )).all()
     return columns
 
 
 @router.put("/{column_id}", response_model=ColumnOut)
-def update_column(column_id: int, column: ColumnCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    db_column = (
-        db.query(ColumnModel)
+async def update_column(column_id: int, column: ColumnCreate, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
+    db_column = await db.scalar(
+        select(ColumnModel)
         .join(Board)
         .join(Project)
         .filter(ColumnModel.id == column_id, Project.owner_id == current_user.user_id)
-        .first()
     )
     if not db_column:
         raise HTTPException(status_code=404, detail="Column not found or access denied")
@@ -67,57 +77,54 @@ def update_column(column_id: int, column: ColumnCreate, db: Session = Depends(ge
     
     db_column.name = column.name
  
-    db.commit()
-    db.refresh(db_column)
+    await db.commit()
+    await db.refresh(db_column)
     return db_column
 
 
 # Delete a column
 @router.delete("/{column_id}")
-def delete_column(column_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    db_column = (
-        db.query(ColumnModel)
+async def delete_column(column_id: int, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
+    db_column = await db.scalar(
+        select(ColumnModel)
         .join(Board)
         .join(Project)
         .filter(ColumnModel.id == column_id, Project.owner_id == current_user.user_id)
-        .first()
     )
     if not db_column:
         raise HTTPException(status_code=404, detail="Column not found or access denied")
     board_id = db_column.board_id
 
     # Delete the column
-    db.delete(db_column)
+    await db.delete(db_column)
 
     # Recompute positions for remaining columns in this board to avoid unique-constraint conflicts
-    remaining = (
-        db.query(ColumnModel)
+    remaining = (await db.scalars(
+        select(ColumnModel)
         .filter(ColumnModel.board_id == board_id)
         .order_by(ColumnModel.position)
-        .all()
-    )
+    )).all()
 
     # Reassign positions sequentially starting from 1
     for idx, col in enumerate(remaining, start=1):
         col.position = idx
 
-    db.commit()
+    await db.commit()
     return {"message": "Column deleted successfully"}
 
 @router.put("/{column_id}/reorder", response_model=ColumnOut)
-def reorder_column(
+async def reorder_column(
     column_id: int, 
     reorder_data: ColumnReorder, 
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_async_db), 
     current_user = Depends(get_current_user)
 ):
     # Verify the column exists and user has access
-    db_column = (
-        db.query(ColumnModel)
+    db_column = await db.scalar(
+        select(ColumnModel)
         .join(Board)
         .join(Project)
         .filter(ColumnModel.id == column_id, Project.owner_id == current_user.user_id)
-        .first()
     )
     if not db_column:
         raise HTTPException(status_code=404, detail="Column not found or access denied")
@@ -127,9 +134,10 @@ def reorder_column(
     board_id = db_column.board_id
 
     # Validate new_position
-    max_position = db.query(func.max(ColumnModel.position))\
-        .filter(ColumnModel.board_id == board_id)\
-        .scalar() or 0
+    max_position = await db.scalar(
+        select(func.max(ColumnModel.position))
+        .filter(ColumnModel.board_id == board_id)
+    ) or 0
     
     if new_position < 1 or new_position > max_position:
         raise HTTPException(status_code=400, detail=f"Invalid position. Must be between 1 and {max_position}")
@@ -140,30 +148,36 @@ def reorder_column(
 
     # Step 1: Move the column to a temporary negative position to avoid conflicts
     db_column.position = -1
-    db.flush()  # Apply this change immediately
+    await db.flush()  # Apply this change immediately
 
     # Step 2: Reorder other columns
     if new_position < old_position:
         # Moving left: shift columns between new_position and old_position to the right
-        db.query(ColumnModel)\
-            .filter(ColumnModel.board_id == board_id)\
-            .filter(ColumnModel.position >= new_position)\
-            .filter(ColumnModel.position < old_position)\
-            .update({ColumnModel.position: ColumnModel.position + 1}, synchronize_session=False)
+        await db.execute(
+            update(ColumnModel)
+            .filter(ColumnModel.board_id == board_id)
+            .filter(ColumnModel.position >= new_position)
+            .filter(ColumnModel.position < old_position)
+            .values(position=ColumnModel.position + 1)
+            .execution_options(synchronize_session=False)
+        )
     else:
         # Moving right: shift columns between old_position and new_position to the left
-        db.query(ColumnModel)\
-            .filter(ColumnModel.board_id == board_id)\
-            .filter(ColumnModel.position > old_position)\
-            .filter(ColumnModel.position <= new_position)\
-            .update({ColumnModel.position: ColumnModel.position - 1}, synchronize_session=False)
+        await db.execute(
+            update(ColumnModel)
+            .filter(ColumnModel.board_id == board_id)
+            .filter(ColumnModel.position > old_position)
+            .filter(ColumnModel.position <= new_position)
+            .values(position=ColumnModel.position - 1)
+            .execution_options(synchronize_session=False)
+        )
 
-    db.flush()  # Apply the shifts
+    await db.flush()  # Apply the shifts
 
     # Step 3: Move the column to its final position
     db_column.position = new_position
     
-    db.commit()
-    db.refresh(db_column)
+    await db.commit()
+    await db.refresh(db_column)
     return db_column
 
@@ -0,0 +1,118 @@
+import logging
+from typing import Literal, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from minio.error import S3Error
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
+from app.models.export_job import ExportJob
+from app.models.project import Project
+from app.schemas.export_schema import ExportJobOut
+from app.services.readiness import require_storage
+from app.services.jwt_service import get_current_user
+from app.services.export_jobs import submit_export_job, EXPORT_MEDIA_TYPES
+from app.services.minio_client import client, BUCKET, run_minio
+from app.constant import EXPORT_DONE, EXPORT_FAILED
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(dependencies=[Depends(require_storage)])
+
+
+async def _get_job(db: AsyncSession, job_id: UUID, current_user) -> ExportJob:
+    job = await db.scalar(
+        select(ExportJob).filter(ExportJob.job_id == job_id, ExportJob.owner_id == current_user.user_id)
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found or access denied")
+    return job
+
+
+# Submit an export job, rendering happens in the export process pool
+@router.post("/{export_format}/{public_project_id}", response_model=ExportJobOut, status_code=status.HTTP_202_ACCEPTED)
+async def submit_export(
+    export_format: Literal["pdf", "csv", "ndjson", "xlsx"],
+    public_project_id: UUID,
+    board_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    project = await db.scalar(
+        select(Project)
+        .filter(Project.public_project_id == public_project_id, Project.owner_id == current_user.user_id)
+    )
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found or access denied")
+
+    job = ExportJob(
+        owner_id=current_user.user_id,
+        project_id=project.public_project_id,
+        board_id=board_id,
+        format=export_format,
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+
+    try:
+        queued = submit_export_job(job.job_id)
+    except Exception as e:
+        logger.exception("Could not queue export job %s", job.job_id)
+        job.status = EXPORT_FAILED
+        job.error = f"Could not queue export: {e}"[:1000]
+        await db.commit()
+        raise HTTPException(status_code=503, detail="Export workers are unavailable, try again later")
+    if not queued:
+        job.status = EXPORT_FAILED
+        job.error = "Export queue is full"
+        await db.commit()
+        raise HTTPException(status_code=429, detail="Too many exports in progress, try again later")
+
+    return job
+
+
+@router.get("/{job_id}", response_model=ExportJobOut)
+async def get_export_status(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    return await _get_job(db, job_id, current_user)
+
+
+@router.get("/{job_id}/download")
+async def download_export(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    job = await _get_job(db, job_id, current_user)
+    if job.status != EXPORT_DONE:
+        raise HTTPException(status_code=409, detail=f"Export is {job.status}")
+
+    try:
+        response = await run_minio(client.get_object, bucket_name=BUCKET, object_name=job.object_name)
+    except S3Error as e:
+        if e.code != "NoSuchKey":
+            raise
+        # the result was purged or removed from the bucket while the job row still says done
+        logger.warning("Export %s has no object %s", job.job_id, job.object_name)
+        raise HTTPException(status_code=410, detail="Export result is no longer available")
+
+    def stream():
+        try:
+            yield from response.stream(64 * 1024)
+        finally:
+            response.close()
+            response.release_conn()
+
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_MEDIA_TYPES[job.format],
+        headers={
+            "Content-Disposition": f"attachment; filename=export_{job.job_id}.{job.format}",
+            "Content-Length": str(job.size),
+        },
+    )
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.db.database import get_pool_status
+from app.services.password_service import password_hasher
+from app.services.jwt_service import get_current_user
+from app.constant import ADMIN_ROLE
+
+router = APIRouter()
+
+
+def require_admin(current_user=Depends(get_current_user)):
+    if current_user.role != ADMIN_ROLE:
+        raise HTTPException(status_code=403, detail="Admin role required")
+    return current_user
+
+
+@router.get("/db-pool")
+def db_pool_status(current_user=Depends(require_admin)):
+    return get_pool_status()
+
+
+@router.get("/password-hashing")
+def password_hashing_status(current_user=Depends(require_admin)):
+    return password_hasher.snapshot()
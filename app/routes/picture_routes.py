@@ -1,74 +1,190 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from email.utils import format_datetime
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, Request, Response
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from urllib.parse import urlparse
 import uuid
 from app.db.database import get_db
 from app.models.user import User
-from app.services.jwt_service import get_current_user
-from app.services.minio_client import upload_file_to_minio, delete_file_from_minio, BUCKET , get_file_from_minio
-from fastapi.responses import StreamingResponse
-from io import BytesIO
+from app.services.readiness import require_storage
+from app.services.jwt_service import get_current_user, invalidate_user
+from app.schemas.user_schema import UserPrincipal
+from app.services.minio_client import (
+    upload_file_to_minio, delete_file_from_minio, run_minio, stat_file_in_minio, stream_file_from_minio,
+    upload_size,
+)
+from app.services.avatar_service import (
+    avatar_path, variant_name, avatar_etag, original_media_type, make_thumbnails, store_thumbnails,
+    get_thumbnail, delete_thumbnails, presigned_avatar_url, InvalidImageError, AVATAR_MEDIA_TYPE,
+)
+from app.services.etag_service import etag_matches, not_modified
+from app.env import AVATAR_SIZES, AVATAR_MAX_BYTES, AVATAR_PRESIGNED_REDIRECT
+from fastapi.responses import RedirectResponse, StreamingResponse
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(require_storage)])
+
+
+def _byte_range(header: Optional[str], size: int) -> Optional[tuple]:
+    """(start, end) inclusive for a single `bytes=` range, None to send the whole object."""
+    if size == 0 or not header or not header.startswith("bytes=") or "," in header:
+        # an empty object has no satisfiable range, it is sent as an empty 200
+        return None
+    start, _, end = header[len("bytes="):].strip().partition("-")
+    try:
+        if not start:
+            # suffix range: the last `end` bytes
+            length = int(end)
+            if length <= 0:
+                raise ValueError
+            return max(size - length, 0), size - 1
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, min(end, size - 1)
 
 
 @router.get("/my-profile-picture")
 async def get_profile_picture(
-        current_user: User = Depends(get_current_user),
+        request: Request,
+        size: Optional[int] = Query(None, description=f"Thumbnail size in px, one of {list(AVATAR_SIZES)}; original when omitted"),
+        current_user: UserPrincipal = Depends(get_current_user),
 ):
     if not current_user.avatar_url:
         raise HTTPException(status_code=404, detail="No profile picture found")
+    if size is not None and size not in AVATAR_SIZES:
+        raise HTTPException(status_code=400, detail=f"Unsupported size, use one of {list(AVATAR_SIZES)}")
+
+    path_in_bucket = avatar_path(current_user.avatar_url)
+    # This URL follows the current avatar, so it is revalidated on every use;
+    # the 304 needs no MinIO call because the object name determines the ETag
+    etag = avatar_etag(path_in_bucket, size)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    if AVATAR_PRESIGNED_REDIRECT:
+        try:
+            url = await run_minio(presigned_avatar_url, path_in_bucket, size)
+        except InvalidImageError:
+            raise HTTPException(status_code=415, detail="Profile picture is not a supported image")
+        if url is None:
+            raise HTTPException(status_code=404, detail="No profile picture found")
+        return RedirectResponse(url, status_code=307, headers={"Cache-Control": "private, no-cache"})
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Accept-Ranges": "bytes"}
+    if size is not None:
+        name = variant_name(path_in_bucket, size)
+        media_type = AVATAR_MEDIA_TYPE
+        stat = await stat_file_in_minio(name)
+        if stat is None:
+            # pictures uploaded before thumbnails existed, generated on first request
+            try:
+                thumbnail = await run_minio(get_thumbnail, path_in_bucket, size)
+            except InvalidImageError:
+                raise HTTPException(status_code=415, detail="Profile picture is not a supported image")
+            if thumbnail is None:
+                raise HTTPException(status_code=404, detail="No profile picture found")
+            return Response(thumbnail, media_type=media_type, headers=headers)
+    else:
+        name = path_in_bucket
+        stat = await stat_file_in_minio(name)
+        if stat is None:
+            raise HTTPException(status_code=404, detail="No profile picture found")
+        media_type = original_media_type(name, stat.content_type)
+
+    if stat.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(stat.last_modified, usegmt=True)
+    byte_range = _byte_range(request.headers.get("range"), stat.size)
+    if byte_range is None:
+        headers["Content-Length"] = str(stat.size)
+        return StreamingResponse(stream_file_from_minio(name), media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Length"] = str(end - start + 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/{stat.size}"
+    return StreamingResponse(
+        stream_file_from_minio(name, offset=start, length=end - start + 1),
+        status_code=206,
+        media_type=media_type,
+        headers=headers,
+    )
 
-    path_in_bucket = urlparse(current_user.avatar_url).path.lstrip(f"/{BUCKET}/")
-    file_data = await get_file_from_minio(path_in_bucket)
+async def _store_avatar(file: UploadFile, user_id) -> str:
+    """Validate, upload and thumbnail a new profile picture. Returns its URL."""
+    size = await run_in_threadpool(upload_size, file.file)
+    if size > AVATAR_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Profile picture is larger than {AVATAR_MAX_BYTES} bytes")
+
+    # Thumbnails are made before anything is stored, so non-images are rejected up front
+    try:
+        thumbnails = await run_in_threadpool(make_thumbnails, file.file)
+    except InvalidImageError:
+        raise HTTPException(status_code=400, detail="Uploaded file is not a supported image")
+    await file.seek(0)
+
+    filename = f"profile_pictures/{user_id}_{uuid.uuid4()}_{file.filename}"
+    url = await upload_file_to_minio(file, filename, size=size)
+    try:
+        await run_minio(store_thumbnails, filename, thumbnails)
+    except Exception:
+        # do not leave the original (or some of the variants) behind without a user pointing at it
+        await delete_file_from_minio(filename)
+        await run_minio(delete_thumbnails, filename)
+        raise
+    return url
 
-    return StreamingResponse(BytesIO(file_data), media_type="application/octet-stream")
 
 @router.post("/upload")
 async def upload_profile_picture(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    filename = f"profile_pictures/{current_user.user_id}_{uuid.uuid4()}_{file.filename}"
-    url = await upload_file_to_minio(file, filename)
-    current_user.avatar_url = url
+    url = await _store_avatar(file, current_user.user_id)
+    user = db.query(User).filter(User.user_id == current_user.user_id).first()
+    user.avatar_url = url
     db.commit()
-    db.refresh(current_user)
+    invalidate_user(user.user_id)
     return {"profile_picture_url": url}
 
 
-
 @router.put("/edit")
 async def edit_profile_picture(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    if current_user.profile_picture_url:
-        path_in_bucket = urlparse(current_user.profile_picture_url).path.lstrip(f"/{BUCKET}/")
-        await delete_file_from_minio(path_in_bucket)
-
-    filename = f"/{current_user.user_id}_{uuid.uuid4()}_{file.filename}"
-    url = await upload_file_to_minio(file, filename)
-    current_user.profile_picture_url = url
+    url = await _store_avatar(file, current_user.user_id)
+    user = db.query(User).filter(User.user_id == current_user.user_id).first()
+    previous_url = user.avatar_url
+    user.avatar_url = url
     db.commit()
-    db.refresh(current_user)
+    invalidate_user(user.user_id)
+
+    # the old picture is removed only once the user points at the new one
+    if previous_url:
+        path_in_bucket = avatar_path(previous_url)
+        await delete_file_from_minio(path_in_bucket)
+        await run_minio(delete_thumbnails, path_in_bucket)
     return {"profile_picture_url": url}
 
 
 @router.delete("/delete")
 async def delete_profile_picture(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     if not current_user.avatar_url:
         raise HTTPException(status_code=404, detail="No profile picture to delete")
 
-    path_in_bucket = urlparse(current_user.avatar_url).path.lstrip(f"/{BUCKET}/")
+    path_in_bucket = avatar_path(current_user.avatar_url)
     await delete_file_from_minio(path_in_bucket)
+    await run_minio(delete_thumbnails, path_in_bucket)
 
-    current_user.avatar_url = None
+    user = db.query(User).filter(User.user_id == current_user.user_id).first()
+    user.avatar_url = None
     db.commit()
-    db.refresh(current_user)
+    invalidate_user(user.user_id)
     return {"detail": "Profile picture deleted"}
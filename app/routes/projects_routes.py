@@ -1,27 +1,36 @@
+import tempfile
 from typing import List, Optional
-from io import BytesIO
-from fastapi import APIRouter, Depends, HTTPException, status
+from io import TextIOWrapper
+from uuid import UUID
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Request, Response, UploadFile, status
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
-from app.db.database import get_db
+from app.db.database import get_db, get_async_db
 from app.models.project import Project
-from app.models.board import Board
-from app.models.column import ColumnModel
-from app.models.task import Task
 from app.schemas.project_schema import ProjectCreate, ProjectOut, ProjectUpdate
 from app.services.jwt_service import get_current_user
-
-from app.services.pdf_service import build_project_pdf
-from app.services.csv_service import build_project_csv
+from app.services.readiness import require_storage
+from app.services.etag_service import make_etag, etag_matches, not_modified, set_etag
+
+from app.services.pdf_service import write_project_pdf
+from app.services.export_formats import EXPORT_FORMATS
+from app.services.export_service import iter_project_rows, pdf_export_boards
+from app.services.import_service import import_project_csv
+from app.services.export_cache import (
+    export_fingerprint, get_cached_export, cache_while_streaming, stream_spooled_export, delete_project_exports,
+    SPOOL_MAX_SIZE,
+)
 
 router = APIRouter()
 
 @router.post("/add", response_model=ProjectOut, status_code=status.HTTP_201_CREATED)
-def create_project(
+async def create_project(
     project: ProjectCreate,
     current_user=Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     new_project = Project(
         name=project.name,
@@ -31,30 +40,40 @@ def create_project(
         owner_id=current_user.user_id,
     )
     db.add(new_project)
-    db.commit()
-    db.refresh(new_project)
+    await db.commit()
+    await db.refresh(new_project)
     return new_project
 
 
 @router.get("/getall", response_model=List[ProjectOut])
-def get_projects(
-    db: Session = Depends(get_db),
+async def get_projects(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_user),
 ):
-    projects = db.query(Project).filter(Project.owner_id == current_user.user_id).all()
+    count, last_modified = (await db.execute(
+        select(func.count(Project.project_id), func.max(Project.updated_at))
+        .filter(Project.owner_id == current_user.user_id)
+    )).one()
+    etag = make_etag("projects", current_user.user_id, count, last_modified)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    projects = (await db.scalars(select(Project).filter(Project.owner_id == current_user.user_id))).all()
     return projects
 
 
 @router.get("/{public_project_id}", response_model=ProjectOut)
-def get_project(
-    public_project_id: str,
-    db: Session = Depends(get_db),
+async def get_project(
+    public_project_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_user),
 ):
-    project = (
-        db.query(Project)
+    project = await db.scalar(
+        select(Project)
         .filter(Project.public_project_id == public_project_id, Project.owner_id == current_user.user_id)
-        .first()
     )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found or access denied")
@@ -62,16 +81,15 @@ def get_project(
 
 
 @router.put("/update/{public_project_id}", response_model=ProjectOut)
-def update_project(
-    public_project_id: str,
+async def update_project(
+    public_project_id: UUID,
     project_update: ProjectUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_user),
 ):
-    project = (
-        db.query(Project)
+    project = await db.scalar(
+        select(Project)
         .filter(Project.public_project_id == public_project_id, Project.owner_id == current_user.user_id)
-        .first()
     )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found or access denied")
@@ -89,31 +107,32 @@ def update_project(
         else:
             project.archived_at = None
 
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     return project
 
 
 @router.delete("/delete/{public_project_id}")
-def delete_project(
-    public_project_id: str,
-    db: Session = Depends(get_db),
+async def delete_project(
+    public_project_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_user),
 ):
-    project = (
-        db.query(Project)
+    project = await db.scalar(
+        select(Project)
         .filter(Project.public_project_id == public_project_id, Project.owner_id == current_user.user_id)
-        .first()
     )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found or access denied")
 
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await db.commit()
+    background_tasks.add_task(delete_project_exports, project.public_project_id)
     return {"detail": f"Project '{project.name}' deleted successfully"}
 
 
-@router.get("/pdf/{public_project_id}")
+@router.get("/pdf/{public_project_id}", dependencies=[Depends(require_storage)])
 def generate_project_pdf(
     public_project_id: str,
     board_id: Optional[int] = None,
@@ -122,6 +141,7 @@ def generate_project_pdf(
 ):
     """
     Generate a PDF for the project containing all columns and tasks.
+    Kept synchronous: rendering is CPU bound and belongs in the threadpool, not on the event loop.
     """
     # Pobierz projekt z boardami, kolumnami i taskami
     project = (
@@ -132,38 +152,49 @@ def generate_project_pdf(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found or access denied")
 
+    filename = f"project_{project.name.replace(' ', '_')}.pdf"
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+
+    fingerprint = export_fingerprint(db, project, board_id)
+    cached = get_cached_export(project.public_project_id, "pdf", board_id, fingerprint)
+    if cached is not None:
+        return StreamingResponse(cached, media_type="application/pdf", headers=headers)
+
     # Pobierz wszystkie boardy projektu wraz z kolumnami i taskami
     # If board_id provided, return only that board (if it belongs to the project)
-    query = db.query(Board).options(joinedload(Board.columns).joinedload(ColumnModel.tasks))
-    if board_id is not None:
-        query = query.filter(Board.id == board_id, Board.project_id == project.public_project_id)
-    else:
-        query = query.filter(Board.project_id == project.public_project_id)
-    boards = query.all()
-
-    buffer = build_project_pdf(project, boards)
+    boards = pdf_export_boards(db, project.public_project_id, board_id)
 
-    filename = f"project_{project.name.replace(' ', '_')}.pdf"
+    # Rendered into a spooled file (on disk past SPOOL_MAX_SIZE) and sent from there in chunks
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    try:
+        write_project_pdf(project, boards, spool)
+    except Exception:
+        spool.close()
+        raise
 
     return StreamingResponse(
-        buffer,
+        stream_spooled_export(spool, project.public_project_id, "pdf", board_id, fingerprint),
         media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
+        headers=headers
     )
 
 
-@router.get("/csv/{public_project_id}")
-def generate_project_csv(
+# csv, ndjson or xlsx, see export_formats.EXPORT_FORMATS; pdf has its own route above
+@router.get("/{export_format}/{public_project_id}", dependencies=[Depends(require_storage)])
+def generate_project_export(
+    export_format: str,
     public_project_id: str,
     board_id: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
     """
-    Generate CSV for the project containing all columns and tasks.
+    Export the project's boards, columns and tasks in one of the row based formats.
     """
+    export = EXPORT_FORMATS.get(export_format)
+    if export is None:
+        raise HTTPException(status_code=404, detail=f"Unknown export format '{export_format}'")
+
     project = (
         db.query(Project)
         .filter(Project.public_project_id == public_project_id, Project.owner_id == current_user.user_id)
@@ -172,21 +203,47 @@ def generate_project_csv(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found or access denied")
 
-    query = db.query(Board).options(joinedload(Board.columns).joinedload(ColumnModel.tasks))
-    if board_id is not None:
-        query = query.filter(Board.id == board_id, Board.project_id == project.public_project_id)
-    else:
-        query = query.filter(Board.project_id == project.public_project_id)
-    boards = query.all()
+    filename = f"project_{project.name.replace(' ', '_')}.{export_format}"
 
-    buffer = build_project_csv(project, boards)
+    fingerprint = export_fingerprint(db, project, board_id)
+    cached = get_cached_export(project.public_project_id, export_format, board_id, fingerprint)
+    if cached is not None:
+        return StreamingResponse(cached, media_type=export.media_type, headers={"Content-Disposition": f"attachment; filename={filename}"})
 
-    filename = f"project_{project.name.replace(' ', '_')}.csv"
+    # Rows are read from a server-side cursor and written out chunk by chunk
+    rows = iter_project_rows(project.public_project_id, board_id)
+    chunks = cache_while_streaming(export.writer(rows), project.public_project_id, export_format, board_id, fingerprint)
 
     return StreamingResponse(
-        buffer,
-        media_type="text/csv",
+        chunks,
+        media_type=export.media_type,
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
         }
     )
+
+
+@router.post("/csv/{public_project_id}", dependencies=[Depends(require_storage)])
+async def import_project_tasks_csv(
+    public_project_id: UUID,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Import boards, columns and tasks from a CSV in the export layout.
+    Progress is streamed back as NDJSON while the rows are inserted.
+    """
+    project = await db.scalar(
+        select(Project)
+        .filter(Project.public_project_id == public_project_id, Project.owner_id == current_user.user_id)
+    )
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found or access denied")
+
+    # utf-8-sig strips the BOM written by the CSV export
+    stream = TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    return StreamingResponse(
+        import_project_csv(project.public_project_id, stream),
+        media_type="application/x-ndjson",
+    )
@@ -1,40 +1,81 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.db.database import get_db
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, insert, select, tuple_, update
+from app.db.database import get_async_db
 from app.models.task import Task
 from app.models.column import ColumnModel
 from app.models.board import Board
 from app.models.project import Project
-from app.schemas.task_schema import TaskCreate, TaskOut, TaskUpdate
-from typing import List
+from app.schemas.task_schema import TaskCreate, TaskOut, TaskUpdate, TaskBulkMove, TaskBulkCreate
+from typing import List, Literal, Optional
 from app.services.jwt_service import get_current_user
+from app.services.etag_service import make_etag, etag_matches, not_modified, set_etag
+from app.services.task_ordering import (
+    move_task, append_position, gap_position, max_positions, rebalance_column_in_background, plan_moves,
+    GAP_MODE, POSITION_STEP,
+)
 
 router = APIRouter()
 
+
+def _encode_cursor(task: Task, order_by: str) -> str:
+    key = {"id": task.id}
+    if order_by == "due_date":
+        key["due_date"] = task.due_date.isoformat()
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str, order_by: str) -> dict:
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        key["id"] = int(key["id"])
+        if order_by == "due_date":
+            key["due_date"] = datetime.fromisoformat(key["due_date"])
+        return key
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 # Create a column in a board
 @router.post("/create", response_model=TaskOut)
-def create_task(task: TaskCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+async def create_task(
+    task: TaskCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
 
     # Ensure column belongs to the user
-    column = (
-        db.query(ColumnModel)
+    column = await db.scalar(
+        select(ColumnModel)
         .join(Board)
         .join(Project)
         .filter(
             ColumnModel.id == task.column_id,
             Project.owner_id == current_user.user_id
         )
-        .first()
     )
 
     if not column:
         raise HTTPException(status_code=404, detail="Column not found or access denied")
 
+    position = task.position
+    needs_rebalance = False
+    if GAP_MODE:
+        if position is None:
+            position = await append_position(db, task.column_id)
+        else:
+            # the client sends a 1-based slot, turn it into a sparse position between the neighbours
+            position, needs_rebalance = await gap_position(db, task.column_id, max(position, 1))
+
     new_task = Task(
         title=task.title,
         description=task.description,
-        position=task.position,
+        position=position,
         column_id=task.column_id,
         priority=task.priority,
         due_date=task.due_date,
@@ -42,32 +83,154 @@ def create_task(task: TaskCreate, db: Session = Depends(get_db), current_user=De
     )
 
     db.add(new_task)
-    db.commit()
-    db.refresh(new_task)
+    await db.commit()
+    await db.refresh(new_task)
+    if needs_rebalance:
+        background_tasks.add_task(rebalance_column_in_background, task.column_id)
 
     return new_task
 
 
-@router.get("/getall", response_model=List[TaskOut])
-def get_all_tasks(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+# Create many tasks with one ownership check per distinct column and one multi-row INSERT
+@router.post("/bulk", status_code=201)
+async def bulk_create_tasks(payload: TaskBulkCreate, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user)):
+
+    column_ids = {task.column_id for task in payload.tasks}
+    owned_columns = set((await db.scalars(
+        select(ColumnModel.id)
+        .join(Board)
+        .join(Project)
+        .filter(ColumnModel.id.in_(column_ids), Project.owner_id == current_user.user_id)
+    )).all())
+    if owned_columns != column_ids:
+        raise HTTPException(status_code=404, detail="Column not found or access denied")
+
+    positions = await max_positions(db, column_ids)
+    rows = []
+    for task in payload.tasks:
+        # every task is appended first, explicit slots are applied after the insert, see below
+        positions[task.column_id] += POSITION_STEP
+        rows.append({
+            "title": task.title,
+            "description": task.description,
+            "position": positions[task.column_id],
+            "column_id": task.column_id,
+            "priority": task.priority,
+            "due_date": task.due_date,
+            "completed": task.completed,
+        })
+
+    ids = (await db.scalars(insert(Task).returning(Task.id, sort_by_parameter_order=True), rows)).all()
+
+    slotted = [
+        (task_id, task.column_id, max(task.position, 1))
+        for task_id, task in zip(ids, payload.tasks)
+        if task.position is not None
+    ]
+    if slotted:
+        # Place the tasks with a slot exactly like a bulk move: between their neighbours in gap
+        # mode, shifting the siblings in dense mode, so positions never collide
+        existing = (await db.execute(
+            select(Task.id, Task.column_id, Task.position)
+            .filter(Task.column_id.in_({column_id for _, column_id, _ in slotted}))
+            .order_by(Task.column_id, Task.position, Task.id)
+            .with_for_update()
+        )).all()
+        changes = plan_moves(existing, slotted)
+        if changes:
+            await db.execute(
+                update(Task),
+                [
+                    {"id": task_id, "column_id": column_id, "position": position}
+                    for task_id, (column_id, position) in changes.items()
+                ],
+            )
+    await db.commit()
+
+    return {"created": len(ids), "ids": ids}
 
-    tasks = (
-        db.query(Task)
+
+@router.get("/getall", response_model=List[TaskOut])
+async def get_all_tasks(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    order_by: Literal["id", "due_date"] = "id",
+    completed: Optional[bool] = None,
+    priority: Optional[Literal["low", "medium", "high"]] = None,
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None,
+    project_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Keyset-paginated task listing. When `limit` is given and more rows exist,
+    the cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    query = (
+        select(Task)
         .join(ColumnModel)
         .join(Board)
         .join(Project)
         .filter(Project.owner_id == current_user.user_id)
-        .all()
     )
+    if project_id is not None:
+        query = query.filter(Board.project_id == project_id)
+    if completed is not None:
+        query = query.filter(Task.completed == completed)
+    if priority is not None:
+        query = query.filter(Task.priority == priority)
+    if due_from is not None:
+        query = query.filter(Task.due_date >= due_from)
+    if due_to is not None:
+        query = query.filter(Task.due_date <= due_to)
+
+    if order_by == "due_date":
+        query = query.order_by(Task.due_date, Task.id)
+    else:
+        query = query.order_by(Task.id)
+
+    if cursor is not None:
+        key = _decode_cursor(cursor, order_by)
+        if order_by == "due_date":
+            query = query.filter(tuple_(Task.due_date, Task.id) > tuple_(key["due_date"], key["id"]))
+        else:
+            query = query.filter(Task.id > key["id"])
+
+    if limit is not None:
+        # fetch one extra row to know whether another page exists
+        query = query.limit(limit + 1)
+
+    tasks = (await db.scalars(query)).all()
+
+    if limit is not None and len(tasks) > limit:
+        tasks = tasks[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(tasks[-1], order_by)
 
     return tasks
 
 
 @router.get("/{column_id}", response_model=List[TaskOut])
-def get_tasks_for_column(column_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+async def get_tasks_for_column(column_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user)):
 
-    tasks = (
-        db.query(Task)
+    count, last_modified = (await db.execute(
+        select(func.count(Task.id), func.max(Task.updated_at))
+        .join(ColumnModel)
+        .join(Board)
+        .join(Project)
+        .filter(
+            Task.column_id == column_id,
+            Project.owner_id == current_user.user_id
+        )
+    )).one()
+    etag = make_etag("tasks", column_id, count, last_modified)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    tasks = (await db.scalars(
+        select(Task)
         .join(ColumnModel)
         .join(Board)
         .join(Project)
@@ -76,18 +239,17 @@ def get_tasks_for_column(column_id: int, db: Session = Depends(get_db), current_
             Project.owner_id == current_user.user_id
         )
         .order_by(Task.position)
-        .all()
-    )
+    )).all()
 
     return tasks
 
 
 # Update a task
 @router.put("/update/{task_id}", response_model=TaskOut)
-def update_task(task_id: int, task: TaskUpdate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+async def update_task(task_id: int, task: TaskUpdate, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user)):
 
-    existing = (
-        db.query(Task)
+    existing = await db.scalar(
+        select(Task)
         .join(ColumnModel)
         .join(Board)
         .join(Project)
@@ -95,7 +257,6 @@ def update_task(task_id: int, task: TaskUpdate, db: Session = Depends(get_db), c
             Task.id == task_id,
             Project.owner_id == current_user.user_id,
         )
-        .first()
     )
 
     if not existing:
@@ -105,54 +266,14 @@ def update_task(task_id: int, task: TaskUpdate, db: Session = Depends(get_db), c
         existing.title = task.title
     if task.description is not None:
         existing.description = task.description
-    # Handle reordering when position (and optionally column_id) provided
-    if task.position is not None:
-        new_position = task.position
-        target_column_id = task.column_id if task.column_id is not None else existing.column_id
-
-        # Determine max position in target column
-        max_position = db.query(func.max(Task.position)).filter(Task.column_id == target_column_id).scalar() or 0
-
-        if new_position < 1:
+    # Handle reordering when position and/or column_id provided
+    needs_rebalance = False
+    if task.position is not None or task.column_id is not None:
+        if task.position is not None and task.position < 1:
             raise HTTPException(status_code=400, detail="Invalid position")
+        target_column_id = task.column_id if task.column_id is not None else existing.column_id
+        needs_rebalance = await move_task(db, existing, target_column_id, task.position)
 
-        # If moving to a different column, clamp new_position to max+1
-        if target_column_id != existing.column_id:
-            # Removing from old column: shift left positions after the old position
-            db.query(Task).filter(Task.column_id == existing.column_id).filter(Task.position > (existing.position or 0)).update({Task.position: Task.position - 1}, synchronize_session=False)
-
-            # Insert into new column: clamp new_position
-            if new_position > max_position + 1:
-                new_position = max_position + 1
-
-            # Shift tasks at or after new_position in new column to the right
-            db.query(Task).filter(Task.column_id == target_column_id).filter(Task.position >= new_position).update({Task.position: Task.position + 1}, synchronize_session=False)
-
-            existing.position = new_position
-            existing.column_id = target_column_id
-        else:
-            # Moving within same column
-            old_position = existing.position or 0
-            if new_position == old_position:
-                pass
-            else:
-                if new_position > old_position:
-                    # shift left tasks between old_position+1 .. new_position
-                    db.query(Task).filter(Task.column_id == existing.column_id).filter(Task.position > old_position).filter(Task.position <= new_position).update({Task.position: Task.position - 1}, synchronize_session=False)
-                else:
-                    # shift right tasks between new_position .. old_position-1
-                    db.query(Task).filter(Task.column_id == existing.column_id).filter(Task.position >= new_position).filter(Task.position < old_position).update({Task.position: Task.position + 1}, synchronize_session=False)
-
-                existing.position = new_position
-
-    if task.column_id is not None and task.position is None:
-        # If only column_id changed without position, append to end of that column
-        target_column_id = task.column_id
-        max_position = db.query(func.max(Task.position)).filter(Task.column_id == target_column_id).scalar() or 0
-        # Remove from old column positions
-        db.query(Task).filter(Task.column_id == existing.column_id).filter(Task.position > (existing.position or 0)).update({Task.position: Task.position - 1}, synchronize_session=False)
-        existing.column_id = target_column_id
-        existing.position = max_position + 1
     if task.priority is not None:
         existing.priority = task.priority
     if task.completed is not None:
@@ -160,18 +281,75 @@ def update_task(task_id: int, task: TaskUpdate, db: Session = Depends(get_db), c
     if task.due_date is not None:
         existing.due_date = task.due_date
 
-    db.commit()
-    db.refresh(existing)
+    await db.commit()
+    await db.refresh(existing)
+
+    if needs_rebalance:
+        background_tasks.add_task(rebalance_column_in_background, existing.column_id)
 
     return existing
 
 
+# Move many tasks in one transaction
+@router.post("/move", response_model=List[TaskOut])
+async def bulk_move_tasks(payload: TaskBulkMove, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user)):
+
+    task_ids = {move.task_id for move in payload.moves}
+    column_ids = {move.column_id for move in payload.moves}
+
+    owned_tasks = dict((await db.execute(
+        select(Task.id, Task.column_id)
+        .join(ColumnModel)
+        .join(Board)
+        .join(Project)
+        .filter(Task.id.in_(task_ids), Project.owner_id == current_user.user_id)
+    )).all())
+    if len(owned_tasks) != len(task_ids):
+        raise HTTPException(status_code=404, detail="Task not found or access denied")
+
+    owned_columns = set((await db.scalars(
+        select(ColumnModel.id)
+        .join(Board)
+        .join(Project)
+        .filter(ColumnModel.id.in_(column_ids), Project.owner_id == current_user.user_id)
+    )).all())
+    if owned_columns != column_ids:
+        raise HTTPException(status_code=404, detail="Column not found or access denied")
+
+    # Lock every task of the affected columns, then compute the final layout in memory
+    affected_columns = column_ids | set(owned_tasks.values())
+    rows = (await db.execute(
+        select(Task.id, Task.column_id, Task.position)
+        .filter(Task.column_id.in_(affected_columns))
+        .order_by(Task.column_id, Task.position, Task.id)
+        .with_for_update()
+    )).all()
+
+    changes = plan_moves(rows, [(move.task_id, move.column_id, move.position) for move in payload.moves])
+    if changes:
+        await db.execute(
+            update(Task),
+            [
+                {"id": task_id, "column_id": column_id, "position": position}
+                for task_id, (column_id, position) in changes.items()
+            ],
+        )
+    await db.commit()
+
+    tasks = (await db.scalars(
+        select(Task)
+        .filter(Task.id.in_(task_ids))
+        .order_by(Task.column_id, Task.position)
+    )).all()
+    return tasks
+
+
 # Delete a task
 @router.delete("/{task_id}")
-def delete_task(task_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+async def delete_task(task_id: int, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user)):
 
-    existing = (
-        db.query(Task)
+    existing = await db.scalar(
+        select(Task)
         .join(ColumnModel)
         .join(Board)
         .join(Project)
@@ -179,13 +357,12 @@ def delete_task(task_id: int, db: Session = Depends(get_db), current_user=Depend
             Task.id == task_id,
             Project.owner_id == current_user.user_id,
         )
-        .first()
     )
 
     if not existing:
         raise HTTPException(status_code=404, detail="Task not found or access denied")
 
-    db.delete(existing)
-    db.commit()
+    await db.delete(existing)
+    await db.commit()
 
     return {"detail": "Task deleted"}
@@ -1,32 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import get_db, get_async_db
 from app.models.user import User
-from app.schemas.user_schema import UserOut, UserUpdate
-from app.services.jwt_service import get_current_user, decode_token, revoke_token
+from app.schemas.user_schema import UserOut, UserUpdate, UserPrincipal
+from app.services.jwt_service import get_current_user, get_token_claims, oauth2_scheme, revoke_token, invalidate_user
 from app.constant import DELETED
-from fastapi import Request
 from fastapi import Body
 from datetime import datetime, timezone
-from app.utils import hash_password
+from app.services.password_service import hash_password_async
 
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserOut)
-def get_user_data(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.user_id == current_user.user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    return user
+def get_user_data(current_user: UserPrincipal = Depends(get_current_user)):
+    return current_user
 
 
 
 @router.delete("/deleteme", response_model=UserOut)
 def delete_own_account(
-    request: Request,
-    current_user: User = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme),
+    claims=Depends(get_token_claims),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     user = db.query(User).filter(User.user_id == current_user.user_id).first()
@@ -36,26 +34,20 @@ def delete_own_account(
     user.status = DELETED
     db.commit()
     db.refresh(user)
+    invalidate_user(user.user_id)
 
-    token_str = get_authorization_header(request)
-    valid_until_ts = decode_token(token_str).get("exp") if token_str else None
-    if token_str and valid_until_ts:
+    valid_until_ts = claims.get("exp")
+    if valid_until_ts:
         valid_until_dt = datetime.fromtimestamp(valid_until_ts, tz=timezone.utc)
-        revoke_token(token=token_str, db=db, valid_until=valid_until_dt)
+        revoke_token(token=token, db=db, valid_until=valid_until_dt)
 
     return user
 
 
-def get_authorization_header(request: Request) -> str | None:
-    auth_header = request.headers.get("Authorization")
-    if auth_header and auth_header.startswith("Bearer "):
-        return auth_header.split(" ")[1]
-    return None
-
 @router.put("/edit", response_model=UserOut)
 def update_own_account(
     user_update: UserUpdate = Body(...),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     user = db.query(User).filter(User.user_id == current_user.user_id).first()
@@ -73,23 +65,24 @@ def update_own_account(
 
     db.commit()
     db.refresh(user)
+    invalidate_user(user.user_id)
 
     return user
 
 @router.post("/reset-password")
-def reset_password(
+async def reset_password(
     password: str = Body(..., embed=True),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = db.query(User).filter(User.user_id == current_user.user_id).first()
+    user = await db.scalar(select(User).filter(User.user_id == current_user.user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    hashed_password = hash_password(password)
+    hashed_password = await hash_password_async(password)
     user.password_hash = hashed_password
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    invalidate_user(user.user_id)
 
     return {"detail": "Password updated successfully"}
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from uuid import UUID
 from datetime import datetime
+from app.schemas.column_schema import ColumnSnapshot
 
 class BoardCreate(BaseModel):
     name: str
@@ -36,3 +37,5 @@ class BoardOut(BaseModel):
         from_attributes = True
 
 
+class BoardSnapshot(BoardResponse):
+    columns: List[ColumnSnapshot] = []
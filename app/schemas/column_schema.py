@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
+from app.schemas.task_schema import TaskOut
 
 class ColumnCreate(BaseModel):
     name: str
@@ -13,4 +14,8 @@ class ColumnOut(ColumnCreate):
         from_attributes = True
 
 class ColumnReorder(BaseModel):
-    new_position: int
\ No newline at end of file
+    new_position: int
+
+
+class ColumnSnapshot(ColumnOut):
+    tasks: List[TaskOut] = []
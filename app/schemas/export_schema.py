@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+from datetime import datetime
+
+
+class ExportJobOut(BaseModel):
+    job_id: UUID
+    project_id: UUID
+    board_id: Optional[int] = None
+    format: str
+    status: str
+    size: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, validator
-from typing import Optional, Literal
+from pydantic import BaseModel, Field, validator
+from typing import Optional, Literal, List
 from datetime import datetime
 
 class TaskCreate(BaseModel):
@@ -23,6 +23,19 @@ class TaskUpdate(BaseModel):
 
     due_date: Optional[datetime] = None
     
+class TaskBulkCreate(BaseModel):
+    tasks: List[TaskCreate] = Field(..., min_length=1, max_length=10000)
+
+
+class TaskMove(BaseModel):
+    task_id: int
+    column_id: int
+    position: Optional[int] = Field(None, ge=1)
+
+
+class TaskBulkMove(BaseModel):
+    moves: List[TaskMove] = Field(..., min_length=1, max_length=1000)
+
 class TaskOut(BaseModel):
     id: int
     title: str
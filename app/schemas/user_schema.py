@@ -1,5 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
+from uuid import UUID
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -20,6 +21,22 @@ class UserOut(BaseModel):
         from_attributes = True
 
 
+class UserPrincipal(BaseModel):
+    user_id: UUID
+    email: EmailStr
+    username: str
+    name: Optional[str] = None
+    surname: Optional[str] = None
+    bio: Optional[str] = None
+    avatar_url: Optional[str] = None
+    role: Optional[str] = None
+    status: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+        frozen = True
+
+
 class UserUpdate(BaseModel):
     name: Optional[str] = None
     surname: Optional[str] = None
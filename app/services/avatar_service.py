@@ -0,0 +1,179 @@
+import logging
+import mimetypes
+from datetime import timedelta
+from io import BytesIO
+from typing import Optional
+from urllib.parse import urlparse
+from minio.error import S3Error
+from PIL import Image, ImageOps, UnidentifiedImageError
+from app.services.minio_client import client, public_client, BUCKET
+from app.services.etag_service import make_etag
+from app.services.lru_cache import TTLCache
+from app.env import AVATAR_SIZES, AVATAR_FORMAT, AVATAR_PRESIGNED_TTL_SECONDS, USER_CACHE_MAX_SIZE
+
+logger = logging.getLogger(__name__)
+
+AVATAR_MEDIA_TYPES = {
+    "WEBP": "image/webp",
+    "JPEG": "image/jpeg",
+}
+AVATAR_MEDIA_TYPE = AVATAR_MEDIA_TYPES[AVATAR_FORMAT]
+AVATAR_QUALITY = 82
+# object names carry a uuid, so whatever sits at an object URL never changes
+AVATAR_OBJECT_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+# Handing out the same presigned URL for half its lifetime keeps browser caches warm;
+# a freshly signed URL is a different URL and would be downloaded again
+presigned_urls = TTLCache(max_size=USER_CACHE_MAX_SIZE, ttl=AVATAR_PRESIGNED_TTL_SECONDS / 2)
+
+
+class InvalidImageError(ValueError):
+    pass
+
+
+def avatar_path(avatar_url: str) -> str:
+    """Object name of the original upload for the avatar_url stored on the user."""
+    return urlparse(avatar_url).path.removeprefix(f"/{BUCKET}/")
+
+
+def variant_name(path_in_bucket: str, size: int) -> str:
+    return f"{path_in_bucket}@{size}.{AVATAR_FORMAT.lower()}"
+
+
+def avatar_etag(path_in_bucket: str, size: Optional[int]) -> str:
+    # the object name identifies the bytes, no need to ask MinIO; thumbnails also depend on the encoder settings
+    if size is None:
+        return make_etag(path_in_bucket, "original")
+    return make_etag(path_in_bucket, size, AVATAR_FORMAT, AVATAR_QUALITY)
+
+
+def original_media_type(path_in_bucket: str, stored: Optional[str] = None) -> str:
+    """Content type of an original upload; objects stored before uploads kept it are guessed from the name."""
+    if stored and stored != "application/octet-stream":
+        return stored
+    return mimetypes.guess_type(path_in_bucket)[0] or "application/octet-stream"
+
+
+def make_thumbnails(source) -> dict:
+    """
+    Square thumbnails {size: encoded bytes} for every AVATAR_SIZES entry, from image bytes or
+    a binary file object. Raises InvalidImageError.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    try:
+        image = Image.open(source)
+        # let the JPEG decoder downscale while decoding, much cheaper than a full-size decode
+        image.draft("RGB", (max(AVATAR_SIZES), max(AVATAR_SIZES)))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise InvalidImageError(str(e))
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha and AVATAR_FORMAT == "WEBP" else "RGB")
+
+    thumbnails = {}
+    # largest first, every smaller size is resampled from the previous one
+    for size in sorted(AVATAR_SIZES, reverse=True):
+        image = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        out = BytesIO()
+        image.save(out, format=AVATAR_FORMAT, quality=AVATAR_QUALITY)
+        thumbnails[size] = out.getvalue()
+    return thumbnails
+
+
+def store_thumbnails(path_in_bucket: str, thumbnails: dict):
+    for size, data in thumbnails.items():
+        client.put_object(
+            bucket_name=BUCKET,
+            object_name=variant_name(path_in_bucket, size),
+            data=BytesIO(data),
+            length=len(data),
+            content_type=AVATAR_MEDIA_TYPE,
+        )
+
+
+def _read_object(name: str) -> Optional[bytes]:
+    try:
+        response = client.get_object(bucket_name=BUCKET, object_name=name)
+    except S3Error as e:
+        if e.code == "NoSuchKey":
+            return None
+        raise
+    try:
+        return response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def get_thumbnail(path_in_bucket: str, size: int) -> Optional[bytes]:
+    """
+    Resized variant of an avatar. Variants missing for pictures uploaded before thumbnails
+    existed are generated from the original on first request and stored next to it.
+    Returns None when the original is gone.
+    """
+    data = _read_object(variant_name(path_in_bucket, size))
+    if data is not None:
+        return data
+
+    original = _read_object(path_in_bucket)
+    if original is None:
+        return None
+    thumbnails = make_thumbnails(original)
+    try:
+        store_thumbnails(path_in_bucket, thumbnails)
+    except Exception as e:
+        logger.warning("Failed to store thumbnails of %s: %s", path_in_bucket, e)
+    return thumbnails[size]
+
+
+def _object_exists(name: str) -> bool:
+    try:
+        client.stat_object(bucket_name=BUCKET, object_name=name)
+    except S3Error as e:
+        if e.code == "NoSuchKey":
+            return False
+        raise
+    return True
+
+
+def presigned_avatar_url(path_in_bucket: str, size: Optional[int]) -> Optional[str]:
+    """
+    Presigned GET URL of the original (size None) or of a thumbnail, served by MinIO with
+    immutable caching. Missing thumbnails are generated first. Returns None when the
+    picture is gone.
+    """
+    key = (path_in_bucket, size)
+    url = presigned_urls.get(key)
+    if url is not None:
+        return url
+
+    if size is None:
+        name, media_type = path_in_bucket, original_media_type(path_in_bucket)
+        if not _object_exists(name):
+            return None
+    else:
+        name, media_type = variant_name(path_in_bucket, size), AVATAR_MEDIA_TYPE
+        if not _object_exists(name) and get_thumbnail(path_in_bucket, size) is None:
+            return None
+
+    url = public_client.presigned_get_object(
+        bucket_name=BUCKET,
+        object_name=name,
+        expires=timedelta(seconds=AVATAR_PRESIGNED_TTL_SECONDS),
+        response_headers={
+            "response-cache-control": AVATAR_OBJECT_CACHE_CONTROL,
+            "response-content-type": media_type,
+        },
+    )
+    presigned_urls.set(key, url)
+    return url
+
+
+def delete_thumbnails(path_in_bucket: str):
+    presigned_urls.invalidate((path_in_bucket, None))
+    for size in AVATAR_SIZES:
+        presigned_urls.invalidate((path_in_bucket, size))
+        client.remove_object(bucket_name=BUCKET, object_name=variant_name(path_in_bucket, size))
@@ -1,47 +1,43 @@
-from io import BytesIO
-from typing import List
+from typing import Iterable, Iterator
 import csv
 from io import StringIO
 
+CSV_HEADER = ["Board", "Column", "Task Name", "Priority", "Due Date", "Description"]
+CSV_BOM = b"\xef\xbb\xbf"
+CSV_CHUNK_ROWS = 500
 
-def build_project_csv(project, boards) -> BytesIO:
+
+def iter_project_csv(rows: Iterable) -> Iterator[bytes]:
     """
-    Build a CSV file for the given project and boards. Returns a BytesIO.
+    Stream the CSV export chunk by chunk from flat rows of export_service.project_rows_query:
+    one line per task (board, column, task name, priority, due date, description), UTF-8 with a
+    BOM for Excel, without holding the whole file in memory.
     """
     sio = StringIO()
     writer = csv.writer(sio)
+    writer.writerow(CSV_HEADER)
+    pending = 0
+    first = True
 
-    # Header
-    writer.writerow(["Board", "Column", "Task Name", "Priority", "Due Date", "Description"])
-
-    for board in boards:
-        board_name = board.name or ""
-        columns = getattr(board, "columns", []) or []
-        if not columns:
-            writer.writerow([board_name, "", "", "", "", ""])
-            continue
-
-        for col in columns:
-            col_name = col.name or ""
-            tasks = getattr(col, "tasks", []) or []
-            if not tasks:
-                writer.writerow([board_name, col_name, "", "", "", ""])
-                continue
+    for row in rows:
+        due = row.due_date.isoformat() if row.due_date else ""
+        writer.writerow([
+            row.board_name or "",
+            row.column_name or "",
+            row.title or "",
+            row.priority or "",
+            due,
+            row.description or "",
+        ])
+        pending += 1
+        if pending >= CSV_CHUNK_ROWS:
+            chunk = sio.getvalue().encode("utf-8")
+            yield CSV_BOM + chunk if first else chunk
+            first = False
+            sio.seek(0)
+            sio.truncate()
+            pending = 0
 
-            for task in tasks:
-                title = getattr(task, "title", "") or ""
-                priority = getattr(task, "priority", "") or ""
-                due = ""
-                if getattr(task, "due_date", None):
-                    try:
-                        due = task.due_date.isoformat()
-                    except Exception:
-                        due = str(task.due_date)
-                desc = getattr(task, "description", "") or ""
-                writer.writerow([board_name, col_name, title, priority, due, desc])
+    chunk = sio.getvalue().encode("utf-8")
+    yield CSV_BOM + chunk if first else chunk
 
-    data = sio.getvalue()
-    # Prepend UTF-8 BOM for Excel compatibility
-    b = data.encode("utf-8")
-    bom = b"\xef\xbb\xbf"
-    return BytesIO(bom + b)
@@ -0,0 +1,140 @@
+import hashlib
+import logging
+import tempfile
+from io import BytesIO
+from typing import Iterable, Iterator, Optional
+from minio.error import S3Error
+from sqlalchemy import distinct, func, select
+from sqlalchemy.orm import Session
+from app.models.board import Board
+from app.models.column import ColumnModel
+from app.models.task import Task
+from app.services.minio_client import client, BUCKET
+from app.env import EXPORT_CACHE_ENABLED
+
+logger = logging.getLogger(__name__)
+
+# bump when the rendering of any format changes so old cached documents are not served
+EXPORT_CACHE_VERSION = 1
+EXPORT_PREFIX = "exports"
+STREAM_CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+def export_fingerprint(db: Session, project, board_id: Optional[int] = None) -> str:
+    """
+    Cheap "last modified" fingerprint of everything an export renders: counts and max(updated_at)
+    of the boards, columns and tasks in scope plus the project row itself.
+    """
+    query = (
+        select(
+            func.count(distinct(Board.id)),
+            func.max(Board.updated_at),
+            func.count(distinct(ColumnModel.id)),
+            func.max(ColumnModel.updated_at),
+            func.count(Task.id),
+            func.max(Task.updated_at),
+        )
+        .select_from(Board)
+        .outerjoin(ColumnModel, ColumnModel.board_id == Board.id)
+        .outerjoin(Task, Task.column_id == ColumnModel.id)
+        .filter(Board.project_id == project.public_project_id)
+    )
+    if board_id is not None:
+        query = query.filter(Board.id == board_id)
+    stats = db.execute(query).one()
+    parts = (EXPORT_CACHE_VERSION, project.name, project.description, project.updated_at, *stats)
+    return hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:32]
+
+
+def _variant_prefix(project_id, fmt: str, board_id: Optional[int]) -> str:
+    board = board_id if board_id is not None else "all"
+    return f"{EXPORT_PREFIX}/{project_id}/{fmt}/{board}/"
+
+
+def _iter_object(response) -> Iterator[bytes]:
+    try:
+        yield from response.stream(STREAM_CHUNK_SIZE)
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def get_cached_export(project_id, fmt: str, board_id: Optional[int], fingerprint: str) -> Optional[Iterator[bytes]]:
+    if not EXPORT_CACHE_ENABLED:
+        return None
+    try:
+        response = client.get_object(bucket_name=BUCKET, object_name=_variant_prefix(project_id, fmt, board_id) + fingerprint)
+    except S3Error as e:
+        if e.code != "NoSuchKey":
+            logger.warning("Export cache lookup failed: %s", e)
+        return None
+    except Exception as e:
+        logger.warning("Export cache lookup failed: %s", e)
+        return None
+    return _iter_object(response)
+
+
+def store_export(project_id, fmt: str, board_id: Optional[int], fingerprint: str, data, length: Optional[int] = None):
+    """
+    Store a rendered export and drop older renderings of the same variant, so every
+    (project, format, board filter) keeps at most one object in the bucket.
+    """
+    if not EXPORT_CACHE_ENABLED:
+        return
+    if isinstance(data, (bytes, bytearray)):
+        length = len(data)
+        data = BytesIO(data)
+    prefix = _variant_prefix(project_id, fmt, board_id)
+    name = prefix + fingerprint
+    try:
+        client.put_object(bucket_name=BUCKET, object_name=name, data=data, length=length)
+        for obj in client.list_objects(bucket_name=BUCKET, prefix=prefix):
+            if obj.object_name != name:
+                client.remove_object(bucket_name=BUCKET, object_name=obj.object_name)
+    except Exception as e:
+        logger.warning("Export cache store failed: %s", e)
+
+
+def cache_while_streaming(chunks: Iterable[bytes], project_id, fmt: str, board_id: Optional[int], fingerprint: str) -> Iterator[bytes]:
+    """
+    Pass chunks through to the client and store the complete document once the stream ends.
+    Nothing is stored when the client disconnects half way.
+    """
+    if not EXPORT_CACHE_ENABLED:
+        yield from chunks
+        return
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+        for chunk in chunks:
+            spool.write(chunk)
+            yield chunk
+        length = spool.tell()
+        spool.seek(0)
+        store_export(project_id, fmt, board_id, fingerprint, spool, length)
+
+
+def stream_spooled_export(spool, project_id, fmt: str, board_id: Optional[int], fingerprint: str) -> Iterator[bytes]:
+    """
+    Send an export already rendered into a (spooled) temporary file, then store that same file
+    in the cache. The file is closed when the stream ends or the client disconnects.
+    """
+    try:
+        length = spool.seek(0, 2)
+        spool.seek(0)
+        while True:
+            chunk = spool.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+        spool.seek(0)
+        store_export(project_id, fmt, board_id, fingerprint, spool, length)
+    finally:
+        spool.close()
+
+
+def delete_project_exports(project_id):
+    try:
+        for obj in client.list_objects(bucket_name=BUCKET, prefix=f"{EXPORT_PREFIX}/{project_id}/", recursive=True):
+            client.remove_object(bucket_name=BUCKET, object_name=obj.object_name)
+    except Exception as e:
+        logger.warning("Failed to delete cached exports of project %s: %s", project_id, e)
@@ -0,0 +1,160 @@
+"""
+Row based export formats. Every writer takes the flat rows of export_service.project_rows_query
+and yields the encoded document chunk by chunk, so any of them can be streamed to the client,
+cached with cache_while_streaming or written to a file by an export job.
+
+csv:    the human readable layout of csv_service.iter_project_csv (names only)
+ndjson: one JSON object per row with ids, positions and the completed flag
+xlsx:   the same fields as ndjson in a single worksheet, written as a streamed zip
+"""
+
+import json
+import re
+import zipfile
+from typing import Callable, Iterable, Iterator, NamedTuple
+from xml.sax.saxutils import escape
+from app.services.csv_service import iter_project_csv
+
+EXPORT_FIELDS = [
+    "board_id",
+    "board_name",
+    "column_id",
+    "column_name",
+    "column_position",
+    "task_id",
+    "title",
+    "description",
+    "task_position",
+    "priority",
+    "completed",
+    "due_date",
+]
+EXPORT_CHUNK_ROWS = 500
+
+
+class ExportFormat(NamedTuple):
+    media_type: str
+    writer: Callable[[Iterable], Iterator[bytes]]
+
+
+def _row_values(row) -> list:
+    values = [getattr(row, field) for field in EXPORT_FIELDS]
+    due_date = values[-1]
+    values[-1] = due_date.isoformat() if due_date else None
+    return values
+
+
+def iter_project_ndjson(rows: Iterable) -> Iterator[bytes]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(EXPORT_FIELDS, _row_values(row))), separators=(",", ":"), ensure_ascii=False))
+        if len(lines) >= EXPORT_CHUNK_ROWS:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+# Minimal SpreadsheetML package: one sheet, inline strings, no styles
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Tasks" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+XLSX_SHEET_HEAD = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+XLSX_SHEET_TAIL = b'</sheetData></worksheet>'
+# control characters are not allowed in XML 1.0
+_XML_INVALID = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xlsx_cell(value) -> str:
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_XML_INVALID.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values) -> bytes:
+    return ("<row>" + "".join(_xlsx_cell(v) for v in values) + "</row>").encode("utf-8")
+
+
+class _ChunkSink:
+    """Write-only target for ZipFile. Without tell/seek zipfile writes a streamable archive."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_project_xlsx(rows: Iterable) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, content)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(XLSX_SHEET_HEAD)
+            sheet.write(_xlsx_row(EXPORT_FIELDS))
+            for n, row in enumerate(rows, start=1):
+                sheet.write(_xlsx_row(_row_values(row)))
+                if n % EXPORT_CHUNK_ROWS == 0:
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+            sheet.write(XLSX_SHEET_TAIL)
+    yield sink.drain()
+
+
+EXPORT_FORMATS = {
+    "csv": ExportFormat("text/csv", iter_project_csv),
+    "ndjson": ExportFormat("application/x-ndjson", iter_project_ndjson),
+    "xlsx": ExportFormat("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", iter_project_xlsx),
+}
@@ -0,0 +1,184 @@
+import logging
+import multiprocessing
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Optional
+from uuid import UUID
+from app.db.database import SessionLocal, engine
+# spawned workers import only this module; the package import registers every model so FKs such as export_jobs.owner_id -> users resolve
+from app.models import ExportJob, Project
+from app.services.export_formats import EXPORT_FORMATS
+from app.services.export_service import iter_project_rows, pdf_export_boards
+from app.services.minio_client import client, BUCKET
+from app.services.pdf_service import write_project_pdf
+from app.constant import EXPORT_RUNNING, EXPORT_DONE, EXPORT_FAILED
+from app.env import EXPORT_WORKERS, EXPORT_JOB_MAX_PENDING, EXPORT_JOB_TTL_HOURS
+
+logger = logging.getLogger(__name__)
+
+EXPORT_MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    **{name: export.media_type for name, export in EXPORT_FORMATS.items()},
+}
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending = 0
+
+
+def job_object_name(job: ExportJob) -> str:
+    # under the project's export prefix so delete_project_exports removes job results too
+    return f"exports/{job.project_id}/jobs/{job.job_id}.{job.format}"
+
+
+def _init_worker():
+    # connections inherited from the parent must never be used by the child
+    engine.dispose(close=False)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=EXPORT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _executor
+
+
+def submit_export_job(job_id: UUID) -> bool:
+    """
+    Queue a job on the export process pool. Returns False when EXPORT_JOB_MAX_PENDING
+    jobs of this worker are already queued or running, so callers can push back.
+    Raises when the pool cannot take the job; the caller must mark it failed.
+    """
+    global _pending, _executor
+    with _executor_lock:
+        if _pending >= EXPORT_JOB_MAX_PENDING:
+            return False
+        _pending += 1
+    try:
+        future = _get_executor().submit(run_export_job, str(job_id))
+    except Exception as e:
+        with _executor_lock:
+            _pending -= 1
+            if isinstance(e, BrokenProcessPool):
+                # a worker died and took the pool with it, start a fresh one next time
+                _executor = None
+        raise
+    future.add_done_callback(partial(_on_job_done, job_id))
+    return True
+
+
+def _on_job_done(job_id: UUID, future):
+    global _pending
+    with _executor_lock:
+        _pending -= 1
+    exc = future.exception()
+    if exc is not None:
+        # the worker process died before it could record the failure itself
+        logger.error("Export job %s crashed: %s", job_id, exc)
+        _mark_failed(job_id, str(exc))
+
+
+def _mark_failed(job_id, error: str):
+    db = SessionLocal()
+    try:
+        job = db.get(ExportJob, job_id)
+        if job is not None and job.status != EXPORT_DONE:
+            job.status = EXPORT_FAILED
+            job.error = error[:1000]
+            job.finished_at = datetime.utcnow()
+            db.commit()
+    finally:
+        db.close()
+
+
+def _render(db, job: ExportJob, project, spool):
+    if job.format == "pdf":
+        write_project_pdf(project, pdf_export_boards(db, project.public_project_id, job.board_id), spool)
+    else:
+        writer = EXPORT_FORMATS[job.format].writer
+        for chunk in writer(iter_project_rows(project.public_project_id, job.board_id)):
+            spool.write(chunk)
+
+
+def run_export_job(job_id: str):
+    """Entry point executed in the export process pool."""
+    job_id = UUID(job_id)
+    db = SessionLocal()
+    try:
+        job = db.get(ExportJob, job_id)
+        if job is None:
+            return
+
+        try:
+            job.status = EXPORT_RUNNING
+            db.commit()
+
+            project = db.query(Project).filter(Project.public_project_id == job.project_id).first()
+            if project is None:
+                raise ValueError("Project no longer exists")
+
+            with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as spool:
+                _render(db, job, project, spool)
+                size = spool.tell()
+                spool.seek(0)
+                name = job_object_name(job)
+                client.put_object(
+                    bucket_name=BUCKET,
+                    object_name=name,
+                    data=spool,
+                    length=size,
+                    content_type=EXPORT_MEDIA_TYPES[job.format],
+                )
+        except Exception as e:
+            logger.exception("Export job %s failed", job_id)
+            db.rollback()
+            job.status = EXPORT_FAILED
+            job.error = str(e)[:1000]
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            return
+
+        job.status = EXPORT_DONE
+        job.object_name = name
+        job.size = size
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+
+def purge_expired_export_jobs() -> int:
+    """Delete jobs older than EXPORT_JOB_TTL_HOURS together with their result objects."""
+    cutoff = datetime.utcnow() - timedelta(hours=EXPORT_JOB_TTL_HOURS)
+    db = SessionLocal()
+    try:
+        jobs = db.query(ExportJob.job_id, ExportJob.object_name).filter(ExportJob.created_at < cutoff).all()
+        for _, object_name in jobs:
+            if object_name:
+                try:
+                    client.remove_object(bucket_name=BUCKET, object_name=object_name)
+                except Exception as e:
+                    logger.warning("Failed to delete export object %s: %s", object_name, e)
+        if jobs:
+            db.query(ExportJob).filter(ExportJob.job_id.in_([job_id for job_id, _ in jobs])).delete(synchronize_session=False)
+            db.commit()
+        return len(jobs)
+    finally:
+        db.close()
+
+
+def shutdown_export_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,111 @@
+from itertools import groupby
+from operator import attrgetter
+from types import SimpleNamespace
+from typing import Iterable, Iterator, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+from app.db.database import SessionLocal
+from app.models.board import Board
+from app.models.column import ColumnModel
+from app.models.task import Task
+from app.env import PDF_STREAMING
+
+EXPORT_YIELD_PER = 1000
+
+
+def load_export_boards(db: Session, project_id, board_id: Optional[int] = None):
+    """
+    Boards of a project (or the single requested board) with columns and tasks loaded, in the
+    same board, column and task order as project_rows_query.
+    """
+    query = db.query(Board).options(joinedload(Board.columns).joinedload(ColumnModel.tasks))
+    if board_id is not None:
+        query = query.filter(Board.id == board_id, Board.project_id == project_id)
+    else:
+        query = query.filter(Board.project_id == project_id)
+    boards = query.order_by(Board.id).all()
+    # joined collections come back in no particular order; list.sort is not instrumented, nothing gets flushed
+    for board in boards:
+        board.columns.sort(key=attrgetter("position", "id"))
+        for column in board.columns:
+            column.tasks.sort(key=attrgetter("position", "id"))
+    return boards
+
+
+def project_rows_query(project_id, board_id: Optional[int] = None):
+    """
+    One flat row per task (or per empty column / empty board) of a project, in board, column
+    and task order. Boards and columns without children come back with NULL task/column fields.
+    """
+    query = (
+        select(
+            Board.id.label("board_id"),
+            Board.name.label("board_name"),
+            Board.description.label("board_description"),
+            ColumnModel.id.label("column_id"),
+            ColumnModel.name.label("column_name"),
+            ColumnModel.position.label("column_position"),
+            Task.id.label("task_id"),
+            Task.title,
+            Task.description,
+            Task.position.label("task_position"),
+            Task.priority,
+            Task.completed,
+            Task.due_date,
+        )
+        .select_from(Board)
+        .outerjoin(ColumnModel, ColumnModel.board_id == Board.id)
+        .outerjoin(Task, Task.column_id == ColumnModel.id)
+        .filter(Board.project_id == project_id)
+        .order_by(Board.id, ColumnModel.position, ColumnModel.id, Task.position, Task.id)
+        .execution_options(yield_per=EXPORT_YIELD_PER)
+    )
+    if board_id is not None:
+        query = query.filter(Board.id == board_id)
+    return query
+
+
+def iter_project_rows(project_id, board_id: Optional[int] = None) -> Iterator:
+    """
+    Stream project rows from a server-side cursor. Uses its own session so the rows can be
+    consumed while the response is being sent, after the request dependencies are gone.
+    """
+    db = SessionLocal()
+    try:
+        yield from db.execute(project_rows_query(project_id, board_id))
+    finally:
+        db.close()
+
+
+def iter_export_boards(rows: Iterable) -> Iterator[SimpleNamespace]:
+    """
+    Group flat rows of project_rows_query back into board -> columns -> tasks objects shaped
+    like the ORM models, one board at a time, so only the current board is held in memory.
+    """
+    for _, board_rows in groupby(rows, key=attrgetter("board_id")):
+        board = None
+        for row in board_rows:
+            if board is None:
+                board = SimpleNamespace(id=row.board_id, name=row.board_name, description=row.board_description, columns=[])
+            if row.column_id is None:
+                continue
+            if not board.columns or board.columns[-1].id != row.column_id:
+                board.columns.append(SimpleNamespace(id=row.column_id, name=row.column_name, position=row.column_position, tasks=[]))
+            if row.task_id is not None:
+                board.columns[-1].tasks.append(SimpleNamespace(
+                    id=row.task_id,
+                    title=row.title,
+                    description=row.description,
+                    position=row.task_position,
+                    priority=row.priority,
+                    completed=row.completed,
+                    due_date=row.due_date,
+                ))
+        yield board
+
+
+def pdf_export_boards(db: Session, project_id, board_id: Optional[int] = None) -> Iterable:
+    """Boards to render into a PDF: streamed one by one with PDF_STREAMING, otherwise loaded up front."""
+    if PDF_STREAMING:
+        return iter_export_boards(db.execute(project_rows_query(project_id, board_id)))
+    return load_export_boards(db, project_id, board_id)
@@ -0,0 +1,178 @@
+import csv
+import json
+from datetime import datetime, timezone
+from itertools import islice
+from typing import AsyncIterator, TextIO
+from sqlalchemy import func, insert, select
+from starlette.concurrency import run_in_threadpool
+from app.db.database import AsyncSessionLocal
+from app.models.board import Board
+from app.models.column import ColumnModel
+from app.models.task import Task
+from app.services.csv_service import CSV_HEADER
+from app.services.task_ordering import max_positions, POSITION_STEP
+
+IMPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+PRIORITIES = {"low", "medium", "high"}
+
+
+def _parse_due_date(value: str) -> datetime:
+    due = datetime.fromisoformat(value.strip())
+    if due.tzinfo is None:
+        due = due.replace(tzinfo=timezone.utc)
+    return due
+
+
+async def _load_layout(db, project_id):
+    boards = dict((await db.execute(
+        select(Board.name, Board.id).filter(Board.project_id == project_id)
+    )).all())
+    columns = {
+        (board_name, column_name): column_id
+        for board_name, column_name, column_id in (await db.execute(
+            select(Board.name, ColumnModel.name, ColumnModel.id)
+            .join(ColumnModel.board)
+            .filter(Board.project_id == project_id)
+        )).all()
+    }
+    return boards, columns
+
+
+async def _resolve_column(db, project_id, boards, columns, positions, board_name, column_name):
+    """Column id for (board, column) names, creating the board/column when the project has none yet."""
+    key = (board_name, column_name)
+    if key in columns:
+        return columns[key]
+
+    board_id = boards.get(board_name)
+    if board_id is None:
+        board = Board(name=board_name, project_id=project_id)
+        db.add(board)
+        await db.flush()
+        board_id = boards[board_name] = board.id
+
+    next_column_position = await db.scalar(
+        select(func.max(ColumnModel.position)).filter(ColumnModel.board_id == board_id)
+    ) or 0
+    column = ColumnModel(name=column_name, position=next_column_position + 1, board_id=board_id)
+    db.add(column)
+    await db.flush()
+    columns[key] = column.id
+    positions[column.id] = 0
+    return column.id
+
+
+def _progress(**fields) -> str:
+    return json.dumps(fields) + "\n"
+
+
+def _read_header(reader: csv.DictReader):
+    return reader.fieldnames
+
+
+def _read_rows(reader: csv.DictReader, count: int) -> list:
+    return list(islice(reader, count))
+
+
+async def import_project_csv(project_id, stream: TextIO) -> AsyncIterator[str]:
+    """
+    Import tasks from a CSV laid out like iter_project_csv writes it into the given project.
+    Yields NDJSON progress lines; every chunk of IMPORT_CHUNK_SIZE rows is inserted with one
+    executemany INSERT and committed, so progress survives a failure later in the file.
+    Rows without a task name only make sure their board and column exist.
+    """
+    reader = csv.DictReader(stream)
+    # Reading the upload blocks (spooled file + decoding), so it happens in the threadpool
+    try:
+        fieldnames = await run_in_threadpool(_read_header, reader)
+    except (UnicodeDecodeError, csv.Error) as e:
+        yield _progress(done=True, processed=0, created=0, error=f"Could not read CSV: {e}")
+        return
+    missing = {"Board", "Column", "Task Name", "Due Date"} - set(fieldnames or [])
+    if missing:
+        yield _progress(done=True, error=f"Missing CSV columns: {', '.join(sorted(missing))}", expected=CSV_HEADER)
+        return
+
+    async with AsyncSessionLocal() as db:
+        boards, columns = await _load_layout(db, project_id)
+        positions = await max_positions(db, columns.values())
+
+        processed = created = 0
+        errors = []
+        error_count = 0
+        batch = []
+        read_error = None
+        line = 1
+
+        while True:
+            try:
+                chunk = await run_in_threadpool(_read_rows, reader, IMPORT_CHUNK_SIZE)
+            except (UnicodeDecodeError, csv.Error) as e:
+                # rows before the broken one are still imported, the final line reports the error
+                read_error = f"Could not read CSV after line {line}: {e}"
+                break
+            if not chunk:
+                break
+
+            for row in chunk:
+                line += 1
+                processed += 1
+                board_name = (row.get("Board") or "").strip()
+                column_name = (row.get("Column") or "").strip()
+                title = (row.get("Task Name") or "").strip()
+                priority = (row.get("Priority") or "medium").strip().lower() or "medium"
+
+                try:
+                    if not board_name:
+                        raise ValueError("Board is required")
+                    if title and not column_name:
+                        raise ValueError("Column is required for a task")
+                    if priority not in PRIORITIES:
+                        raise ValueError(f"Invalid priority '{priority}'")
+                    due_date = _parse_due_date(row.get("Due Date") or "") if title else None
+                except ValueError as e:
+                    error_count += 1
+                    if len(errors) < MAX_REPORTED_ERRORS:
+                        errors.append({"line": line, "detail": str(e)})
+                    continue
+
+                if not column_name:
+                    if board_name not in boards:
+                        board = Board(name=board_name, project_id=project_id)
+                        db.add(board)
+                        await db.flush()
+                        boards[board_name] = board.id
+                    continue
+
+                column_id = await _resolve_column(db, project_id, boards, columns, positions, board_name, column_name)
+                if not title:
+                    continue
+
+                positions[column_id] += POSITION_STEP
+                batch.append({
+                    "title": title[:150],
+                    "description": row.get("Description") or None,
+                    "position": positions[column_id],
+                    "column_id": column_id,
+                    "priority": priority,
+                    "due_date": due_date,
+                    "completed": False,
+                })
+
+                if len(batch) >= IMPORT_CHUNK_SIZE:
+                    await db.execute(insert(Task), batch)
+                    await db.commit()
+                    created += len(batch)
+                    batch = []
+                    yield _progress(processed=processed, created=created, errors=error_count)
+
+        if batch:
+            await db.execute(insert(Task), batch)
+            created += len(batch)
+        await db.commit()
+
+    result = dict(done=True, processed=processed, created=created, errors=error_count, error_details=errors)
+    if read_error is not None:
+        result["error"] = read_error
+    yield _progress(**result)
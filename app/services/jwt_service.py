@@ -5,14 +5,26 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.models.user import User
-from app.env import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from types import MappingProxyType
+from app.env import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES,
+    USER_CACHE_TTL_SECONDS, USER_CACHE_MAX_SIZE, TOKEN_CLAIMS_CACHE_SIZE,
+)
 from jose import jwt, JWTError, ExpiredSignatureError
 from app.models.token import Token
 from app.constant import ACCESS_TOKEN
+from app.services.token_cache import revoked_tokens, token_digest, stored_token_value
+from app.services.lru_cache import TTLCache
+from app.schemas.user_schema import UserPrincipal
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# user_id -> UserPrincipal, invalidated by routes that modify the user row
+user_principals = TTLCache(max_size=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+# token digest -> verified claims, entries expire at the token's exp
+verified_claims = TTLCache(max_size=TOKEN_CLAIMS_CACHE_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
 
 def create_token(data: dict, expires_delta: Optional[timedelta] = None, token_type: str = ACCESS_TOKEN):
     to_encode = data.copy()
@@ -29,60 +41,26 @@ def credentials_exception():
     )
 
 
-def verify_token(token: str, db: Session, expected_token: Optional[str] = None):
-
-            if expected_token is not None:
-                decode_type = jwt.get_unverified_claims(token).get("type")
-                if decode_type != expected_token:
-                    raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="Token does not match the expected value",
-                        headers={"WWW-Authenticate": "Bearer"},
-                    )
-
-            revoked = db.query(Token).filter(Token.token == token).first()
-            if revoked:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Token has been revoked",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-
-            try:
-                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-                user_id: str = payload.get("sub")
-                if user_id is None:
-                    raise credentials_exception()
-                return user_id
-            except ExpiredSignatureError:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Token has expired",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-            except JWTError:
-                raise credentials_exception()
-
-
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    user_id = verify_token(token, db, expected_token=ACCESS_TOKEN)
-    user = db.query(User).filter(User.user_id == user_id).first()
-    if not user:
-        raise credentials_exception()
-    # if not user.is_active:
-    #     raise HTTPException(status_code=403, detail="Inactive user")
-    return user
+def _decode_verified(token: str):
+    """
+    Verify the signature and expiry of a token, memoized by token digest until its exp.
+    Raises jose errors like jwt.decode.
+    """
+    digest = token_digest(token)
+    claims = verified_claims.get(digest)
+    if claims is not None:
+        return claims
 
+    claims = MappingProxyType(jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]))
+    exp = claims.get("exp")
+    if exp is not None:
+        verified_claims.set(digest, claims, expires_at=float(exp))
+    return claims
 
-def revoke_token(token: str, db: Session = Depends(get_db), valid_until: datetime = None):
-    revoked_token = Token(token=token, valid_until=valid_until)
-    db.add(revoked_token)
-    db.commit()
 
-def decode_token(token: str):
+def verify_token_claims(token: str, db: Session, expected_token: Optional[str] = None):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        claims = _decode_verified(token)
     except ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -90,8 +68,58 @@ def decode_token(token: str):
             headers={"WWW-Authenticate": "Bearer"},
         )
     except JWTError:
+        raise credentials_exception()
+
+    if expected_token is not None and claims.get("type") != expected_token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
+            detail="Token does not match the expected value",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    revoked_tokens.sync(db)
+    if revoked_tokens.is_revoked(token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if claims.get("sub") is None:
+        raise credentials_exception()
+    return claims
+
+
+def get_token_claims(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """
+    Verified claims of the access token. FastAPI caches dependencies per request,
+    so the token is decoded once no matter how many dependencies ask for it.
+    """
+    return verify_token_claims(token, db, expected_token=ACCESS_TOKEN)
+
+
+def get_current_user(claims=Depends(get_token_claims), db: Session = Depends(get_db)):
+    user_id = claims["sub"]
+    principal = user_principals.get(str(user_id))
+    if principal is not None:
+        return principal
+
+    user = db.query(User).filter(User.user_id == user_id).first()
+    if not user:
+        raise credentials_exception()
+    # if not user.is_active:
+    #     raise HTTPException(status_code=403, detail="Inactive user")
+    principal = UserPrincipal.model_validate(user)
+    user_principals.set(str(user_id), principal)
+    return principal
+
+
+def invalidate_user(user_id):
+    user_principals.invalidate(str(user_id))
+
+
+def revoke_token(token: str, db: Session = Depends(get_db), valid_until: datetime = None):
+    revoked_token = Token(token=stored_token_value(token), valid_until=valid_until)
+    db.add(revoked_token)
+    db.commit()
+    revoked_tokens.add(token, valid_until)
@@ -1,40 +1,120 @@
 from minio import Minio
+import asyncio
 import os
-from io import BytesIO
-from app.env import MINIO_ENDPOINT, MINIO_ACCESS_KEY, MINIO_SECRET_KEY, MINIO_SECURE
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Optional
+import certifi
+import urllib3
+from fastapi import HTTPException
+from minio.error import S3Error
+from app.env import (
+    MINIO_ENDPOINT, MINIO_ACCESS_KEY, MINIO_SECRET_KEY, MINIO_SECURE,
+    MINIO_MAX_WORKERS, MINIO_POOL_SIZE, MINIO_TIMEOUT_SECONDS, MINIO_PART_SIZE,
+    MINIO_PUBLIC_ENDPOINT, MINIO_REGION,
+)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Same settings as the client's default pool, but with a configurable size and timeout
+http_client = urllib3.PoolManager(
+    timeout=urllib3.Timeout(connect=MINIO_TIMEOUT_SECONDS, read=MINIO_TIMEOUT_SECONDS),
+    maxsize=MINIO_POOL_SIZE,
+    cert_reqs="CERT_REQUIRED",
+    ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+    retries=urllib3.Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+)
 
 client = Minio(
     endpoint=MINIO_ENDPOINT,
     access_key=MINIO_ACCESS_KEY,
     secret_key=MINIO_SECRET_KEY,
     secure=MINIO_SECURE,
+    http_client=http_client,
 )
 
+# Only used to sign URLs handed to browsers. With the region set, signing needs no request.
+public_client = Minio(
+    endpoint=MINIO_PUBLIC_ENDPOINT,
+    access_key=MINIO_ACCESS_KEY,
+    secret_key=MINIO_SECRET_KEY,
+    secure=MINIO_SECURE,
+    region=MINIO_REGION,
+)
+
+# The Minio client is blocking. Calls from async code go through this bounded pool so a slow
+# object store occupies at most MINIO_MAX_WORKERS threads instead of the event loop.
+_executor = ThreadPoolExecutor(max_workers=MINIO_MAX_WORKERS, thread_name_prefix="minio")
+
+
+async def run_minio(func, *args, **kwargs):
+    """Run a blocking MinIO call (or a function doing several) on the MinIO thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+def shutdown_minio_pool():
+    _executor.shutdown(wait=False, cancel_futures=True)
+
 BUCKET = "mybucket"
 endpoint = os.getenv("MINIO_ENDPOINT", "localhost:9000")
 
-if not client.bucket_exists(bucket_name=BUCKET):
-    client.make_bucket(bucket_name=BUCKET)
 
+def ensure_bucket():
+    """Create BUCKET if it is missing. Called from the app lifespan, never at import."""
+    if not client.bucket_exists(bucket_name=BUCKET):
+        client.make_bucket(bucket_name=BUCKET)
 
-async def get_file_from_minio(path_in_bucket: str) -> bytes:
+
+async def stat_file_in_minio(path_in_bucket: str):
+    """Object metadata (size, etag, content_type, ...) or None when the object does not exist."""
     try:
-        response = client.get_object(bucket_name=BUCKET, object_name=path_in_bucket)
-        data = response.read()
+        return await run_minio(client.stat_object, bucket_name=BUCKET, object_name=path_in_bucket)
+    except S3Error as e:
+        if e.code == "NoSuchKey":
+            return None
+        raise
+
+
+async def stream_file_from_minio(path_in_bucket: str, offset: int = 0, length: int = 0) -> AsyncIterator[bytes]:
+    """Object body chunk by chunk, `length` bytes from `offset` (0 means up to the end)."""
+    response = await run_minio(
+        client.get_object, bucket_name=BUCKET, object_name=path_in_bucket, offset=offset, length=length
+    )
+    chunks = response.stream(STREAM_CHUNK_SIZE)
+    try:
+        while True:
+            chunk = await run_minio(next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
         response.close()
         response.release_conn()
-        return data
-    except Exception as e:
-        raise Exception(f"Error retrieving file from MinIO: {e}")
 
 
-async def upload_file_to_minio(file, filename: str):
-    data = await file.read()
-    client.put_object(
+def upload_size(stream) -> int:
+    size = stream.seek(0, os.SEEK_END)
+    stream.seek(0)
+    return size
+
+
+async def upload_file_to_minio(file, filename: str, max_size: Optional[int] = None, size: Optional[int] = None):
+    # UploadFile is already spooled by the multipart parser, so it is streamed to MinIO from
+    # there (multipart past MINIO_PART_SIZE) instead of being read into memory first.
+    # Pass `size` when the caller already measured the upload.
+    if size is None:
+        size = await run_minio(upload_size, file.file)
+    if max_size is not None and size > max_size:
+        raise HTTPException(status_code=413, detail=f"File is larger than {max_size} bytes")
+    await run_minio(
+        client.put_object,
         bucket_name=BUCKET,
         object_name=filename,
-        data=BytesIO(data),
-        length=len(data)
+        data=file.file,
+        length=size,
+        part_size=MINIO_PART_SIZE,
+        content_type=file.content_type or "application/octet-stream",
     )
     #todo later change for docker build
     # endpoint = os.getenv("MINIO_ENDPOINT", "minioCloud:9000")
@@ -43,12 +123,10 @@ async def upload_file_to_minio(file, filename: str):
 
 
 async def delete_file_from_minio(path_in_bucket: str):
-    client.remove_object(bucket_name=BUCKET, object_name=path_in_bucket)
+    await run_minio(client.remove_object, bucket_name=BUCKET, object_name=path_in_bucket)
 
 
 if __name__ == "__main__":
-    import asyncio
-
 
     async def test_connection():
         try:
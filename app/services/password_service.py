@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from app.utils import hash_password, verify_password
+from app.env import PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on its own small thread pool (bcrypt releases the GIL while hashing), so a
+    burst of logins cannot occupy the threadpool every other endpoint runs on.
+    At most `max_pending` operations may be queued or running, further callers get a 429.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.total_run = 0.0
+
+    def _timed(self, queued_at: float, func, *args):
+        started = time.perf_counter()
+        waited = started - queued_at
+        with self._lock:
+            self.running += 1
+            self.total_queue_wait += waited
+            self.max_queue_wait = max(self.max_queue_wait, waited)
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.total_run += time.perf_counter() - started
+
+    def _release(self, _future):
+        # called when the job finished or was cancelled before it started
+        with self._lock:
+            self.pending -= 1
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many password operations in progress, try again later",
+                    headers={"Retry-After": "1"},
+                )
+            self.pending += 1
+        future = self._executor.submit(self._timed, time.perf_counter(), func, *args)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "in_flight": self.pending,
+                "running": self.running,
+                "queued": self.pending - self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_queue_wait_ms": round(self.total_queue_wait / self.completed * 1000, 3) if self.completed else 0.0,
+                "max_queue_wait_ms": round(self.max_queue_wait * 1000, 3),
+                "avg_hash_ms": round(self.total_run / self.completed * 1000, 3) if self.completed else 0.0,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.run(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await password_hasher.run(verify_password, password, hashed)
@@ -1,19 +1,170 @@
-from typing import List
+from typing import Iterable
 from io import BytesIO
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-
-
-def build_project_pdf(project, boards) -> BytesIO:
+from app.env import PDF_FAST_TABLES
+
+# Styles and colour tables are built once per process instead of on every export
+styles = getSampleStyleSheet()
+
+title_style = ParagraphStyle(
+    'CustomTitle',
+    parent=styles['Heading1'],
+    fontSize=20,
+    spaceAfter=20,
+    alignment=1
+)
+
+board_style = ParagraphStyle(
+    'BoardTitle',
+    parent=styles['Heading2'],
+    fontSize=16,
+    spaceAfter=10,
+    spaceBefore=15,
+    textColor=colors.HexColor('#2c3e50')
+)
+
+column_style = ParagraphStyle(
+    'ColumnTitle',
+    parent=styles['Heading3'],
+    fontSize=13,
+    spaceAfter=8,
+    spaceBefore=10,
+    textColor=colors.HexColor('#34495e')
+)
+
+description_style = ParagraphStyle(
+    'Description',
+    parent=styles['Normal'],
+    fontSize=9,
+    textColor=colors.HexColor('#7f8c8d')
+)
+
+cell_style = styles['Normal']
+
+
+def _text_color(background):
+    # choose contrasting text color based on luminance
+    luminance = 0.2126 * background.red + 0.7152 * background.green + 0.0722 * background.blue
+    return colors.white if luminance < 0.6 else colors.black
+
+
+# normalized priority -> (cell background, text color)
+PRIORITY_COLORS = {
+    priority: (background, _text_color(background))
+    for priority, background in {
+        'high': colors.HexColor("#d68d85"),
+        'medium': colors.HexColor("#f3d19a"),
+        'low': colors.HexColor("#78aa8d"),
+    }.items()
+}
+DEFAULT_PRIORITY_COLORS = (colors.HexColor('#95a5a6'), _text_color(colors.HexColor('#95a5a6')))
+
+COL_WIDTHS = [4*cm, 2.5*cm, 2.5*cm, 8*cm]
+# font of plain string cells and the default left + right padding of a table cell
+CELL_FONT = 'Helvetica'
+CELL_FONT_SIZE = 9
+CELL_PADDING = 2 * 6
+
+BASE_TABLE_STYLE = [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTSIZE', (0, 0), (-1, -1), CELL_FONT_SIZE),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTNAME', (0, 1), (-1, -1), CELL_FONT),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+    ('TOPPADDING', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+    ('TOPPADDING', (0, 1), (-1, -1), 6),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#bdc3c7')),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ecf0f1')]),
+]
+
+HEADER_LABELS = ['Name', 'Priority', 'Due Date', 'Description']
+
+# Rows per Table flowable. Splitting one huge Table across pages is quadratic in ReportLab,
+# so long columns are emitted as a series of page-sized tables repeating the header.
+TABLE_CHUNK_ROWS = 40
+
+
+def _cell(text: str, width: float, fast: bool):
+    # Plain strings do not wrap, so in fast mode they are only used when the text fits on one line
+    if (
+        fast
+        and '<' not in text and '&' not in text and '\n' not in text
+        and stringWidth(text, CELL_FONT, CELL_FONT_SIZE) <= width - CELL_PADDING
+    ):
+        return text
+    return Paragraph(text, cell_style)
+
+
+def _task_tables(tasks, fast: bool):
+    for start in range(0, len(tasks), TABLE_CHUNK_ROWS):
+        chunk = tasks[start:start + TABLE_CHUNK_ROWS]
+        if fast:
+            table_data = [list(HEADER_LABELS)]
+        else:
+            table_data = [[Paragraph(f'<b>{label}</b>', cell_style) for label in HEADER_LABELS]]
+        commands = list(BASE_TABLE_STYLE)
+
+        for i, task in enumerate(chunk, start=1):
+            due_date_str = task.due_date.strftime('%Y-%m-%d') if getattr(task, 'due_date', None) else '-'
+            description_text = task.description if getattr(task, 'description', None) else '-'
+            if len(description_text) > 100:
+                description_text = description_text[:100] + '...'
+            raw_priority = (getattr(task, 'priority', '') or '')
+            table_data.append([
+                _cell(task.title, COL_WIDTHS[0], fast),
+                _cell(raw_priority.capitalize(), COL_WIDTHS[1], fast),
+                _cell(due_date_str, COL_WIDTHS[2], fast),
+                _cell(description_text, COL_WIDTHS[3], fast)
+            ])
+
+            # normalize priority: strip whitespace and lowercase before lookup
+            background, text_color = PRIORITY_COLORS.get(raw_priority.strip().lower(), DEFAULT_PRIORITY_COLORS)
+            commands.append(('BACKGROUND', (1, i), (1, i), background))
+            commands.append(('TEXTCOLOR', (1, i), (1, i), text_color))
+
+        table = Table(table_data, colWidths=COL_WIDTHS, repeatRows=1)
+        table.setStyle(TableStyle(commands))
+        yield table
+
+
+def board_flowables(board, fast: bool = PDF_FAST_TABLES):
     """
-    Builds a PDF for the given project and list of boards (with columns and tasks).
-    Returns a BytesIO containing the generated PDF.
+    Flowables for one board: heading, description and a task table per column. Columns and
+    tasks are rendered in the order given, see export_service.pdf_export_boards.
     """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
+    elements = [Paragraph(f"Board: {board.name}", board_style)]
+    if getattr(board, 'description', None):
+        elements.append(Paragraph(board.description, description_style))
+
+    for column in board.columns:
+        elements.append(Paragraph(f"Column: {column.name}", column_style))
+        if column.tasks:
+            elements.extend(_task_tables(column.tasks, fast))
+        else:
+            elements.append(Paragraph("<i>No tasks in this column</i>", description_style))
+        elements.append(Spacer(1, 10))
+    elements.append(Spacer(1, 15))
+    return elements
+
+
+def project_header_flowables(project):
+    elements = [Paragraph(f"{project.name}", title_style)]
+    if project.description:
+        elements.append(Paragraph(f"Description: {project.description}", description_style))
+    elements.append(Spacer(1, 20))
+    return elements
+
+
+def new_document(buffer) -> SimpleDocTemplate:
+    return SimpleDocTemplate(
         buffer,
         pagesize=A4,
         rightMargin=1.5*cm,
@@ -22,129 +173,51 @@ def build_project_pdf(project, boards) -> BytesIO:
         bottomMargin=1.5*cm
     )
 
-    styles = getSampleStyleSheet()
 
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=20,
-        spaceAfter=20,
-        alignment=1
-    )
+class _FlowableFeed(list):
+    """
+    Flowable list for doc.build that pulls the next batch from `batches` only once the
+    previous one has been laid out. ReportLab consumes the list from the front and checks
+    len() before every flowable, so the refill happens there.
+    """
 
-    board_style = ParagraphStyle(
-        'BoardTitle',
-        parent=styles['Heading2'],
-        fontSize=16,
-        spaceAfter=10,
-        spaceBefore=15,
-        textColor=colors.HexColor('#2c3e50')
-    )
+    def __init__(self, batches: Iterable[list]):
+        super().__init__()
+        self._batches = iter(batches)
 
-    column_style = ParagraphStyle(
-        'ColumnTitle',
-        parent=styles['Heading3'],
-        fontSize=13,
-        spaceAfter=8,
-        spaceBefore=10,
-        textColor=colors.HexColor('#34495e')
-    )
+    def __len__(self):
+        while not super().__len__():
+            batch = next(self._batches, None)
+            if batch is None:
+                return 0
+            self.extend(batch)
+        return super().__len__()
 
-    description_style = ParagraphStyle(
-        'Description',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.HexColor('#7f8c8d')
-    )
 
-    elements = []
+def write_project_pdf(project, boards: Iterable, out, fast: bool = PDF_FAST_TABLES):
+    """
+    Render the project into the binary file object `out`. `boards` may be a lazy iterable:
+    a board's flowables are built only after the previous board has been laid out, so at
+    most one board is held as ReportLab objects at a time.
+    """
+    def batches():
+        yield project_header_flowables(project)
+        empty = True
+        for board in boards:
+            empty = False
+            yield board_flowables(board, fast)
+        if empty:
+            yield [Paragraph("<i>Project contains no boards</i>", description_style)]
 
-    elements.append(Paragraph(f"{project.name}", title_style))
-    if project.description:
-        elements.append(Paragraph(f"Description: {project.description}", description_style))
-    elements.append(Spacer(1, 20))
+    new_document(out).build(_FlowableFeed(batches()))
 
-    priority_colors = {
-        'high': colors.HexColor("#d68d85"),
-        'medium': colors.HexColor("#f3d19a"),
-        'low': colors.HexColor("#78aa8d"),
-    }
-
-    for board in boards:
-        elements.append(Paragraph(f"Board: {board.name}", board_style))
-        if getattr(board, 'description', None):
-            elements.append(Paragraph(board.description, description_style))
-
-        sorted_columns = sorted(board.columns, key=lambda c: c.position)
-        for column in sorted_columns:
-            elements.append(Paragraph(f"Column: {column.name}", column_style))
-            sorted_tasks = sorted(column.tasks, key=lambda t: t.position)
-            if sorted_tasks:
-                table_data = [
-                    [
-                        Paragraph('<b>Name</b>', styles['Normal']),
-                        Paragraph('<b>Priority</b>', styles['Normal']),
-                        Paragraph('<b>Due Date</b>', styles['Normal']),
-                        Paragraph('<b>Description</b>', styles['Normal'])
-                    ]
-                ]
-
-                for task in sorted_tasks:
-                    due_date_str = task.due_date.strftime('%Y-%m-%d') if getattr(task, 'due_date', None) else '-'
-                    description_text = task.description if getattr(task, 'description', None) else '-'
-                    if len(description_text) > 100:
-                        description_text = description_text[:100] + '...'
-                    table_data.append([
-                        Paragraph(task.title, styles['Normal']),
-                        Paragraph(task.priority.capitalize(), styles['Normal']),
-                        Paragraph(due_date_str, styles['Normal']),
-                        Paragraph(description_text, styles['Normal'])
-                    ])
-
-                col_widths = [4*cm, 2.5*cm, 2.5*cm, 8*cm]
-                table = Table(table_data, colWidths=col_widths)
-                table_style = TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 9),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-                    ('TOPPADDING', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-                    ('TOPPADDING', (0, 1), (-1, -1), 6),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#bdc3c7')),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ecf0f1')]),
-                ])
-
-                for i, task in enumerate(sorted_tasks, start=1):
-                    # normalize priority: strip whitespace and lowercase before lookup
-                    raw_priority = (getattr(task, 'priority', '') or '')
-                    normalized = raw_priority.strip().lower()
-                    priority_color = priority_colors.get(normalized, colors.HexColor('#95a5a6'))
-
-                    # set cell background for priority column
-                    table_style.add('BACKGROUND', (1, i), (1, i), priority_color)
-
-                    # choose contrasting text color based on luminance
-                    try:
-                        r, g, b = priority_color.red, priority_color.green, priority_color.blue
-                        luminance = 0.2126 * r + 0.7152 * g + 0.0722 * b
-                    except Exception:
-                        luminance = 0.0
-
-                    text_color = colors.white if luminance < 0.6 else colors.black
-                    table_style.add('TEXTCOLOR', (1, i), (1, i), text_color)
-
-                table.setStyle(table_style)
-                elements.append(table)
-            else:
-                elements.append(Paragraph("<i>No tasks in this column</i>", description_style))
-            elements.append(Spacer(1, 10))
-        elements.append(Spacer(1, 15))
-
-    if not boards:
-        elements.append(Paragraph("<i>Project contains no boards</i>", description_style))
-
-    doc.build(elements)
+
+def build_project_pdf(project, boards, fast: bool = PDF_FAST_TABLES) -> BytesIO:
+    """
+    Builds a PDF for the given project and list of boards (with columns and tasks).
+    Returns a BytesIO containing the generated PDF.
+    """
+    buffer = BytesIO()
+    write_project_pdf(project, boards, buffer, fast)
     buffer.seek(0)
     return buffer
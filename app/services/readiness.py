@@ -0,0 +1,14 @@
+from fastapi import HTTPException
+
+# Set by the app lifespan once each dependency has been initialised
+readiness = {"database": False, "storage": False}
+
+
+def require_storage():
+    """Dependency for routes that need MinIO, 503 until the bucket has been set up."""
+    if not readiness["storage"]:
+        raise HTTPException(
+            status_code=503,
+            detail="File storage is not available yet, try again shortly",
+            headers={"Retry-After": "1"},
+        )
@@ -0,0 +1,226 @@
+"""
+Task ordering inside a column.
+
+dense: positions are 1..n, moving a task shifts every sibling between the old and new slot.
+gap:   positions are sparse (multiples of TASK_POSITION_GAP at rebalance time) and a move writes
+       only the moved row, placed halfway between its new neighbours. When two neighbours end up
+       adjacent the column is renumbered, inline if there is no room left for the current move,
+       otherwise in the background.
+
+In both modes the `position` sent by clients is the 1-based slot in the target column.
+"""
+
+from collections import defaultdict
+from typing import Iterable, Optional
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import AsyncSessionLocal
+from app.models.task import Task
+from app.env import TASK_ORDERING, TASK_POSITION_GAP
+
+GAP_MODE = TASK_ORDERING == "gap"
+POSITION_STEP = TASK_POSITION_GAP if GAP_MODE else 1
+
+
+def _shift_positions(column_id: int, delta: int, *conditions):
+    return (
+        update(Task)
+        .filter(Task.column_id == column_id, *conditions)
+        .values(position=Task.position + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def max_position(db: AsyncSession, column_id: int, exclude_id: Optional[int] = None) -> int:
+    conditions = [Task.column_id == column_id]
+    if exclude_id is not None:
+        conditions.append(Task.id != exclude_id)
+    return await db.scalar(select(func.max(Task.position)).filter(*conditions)) or 0
+
+
+async def append_position(db: AsyncSession, column_id: int) -> int:
+    return await max_position(db, column_id) + POSITION_STEP
+
+
+async def max_positions(db: AsyncSession, column_ids: Iterable[int]) -> dict:
+    """Current max position of each column, 0 for empty ones, in one grouped query."""
+    column_ids = set(column_ids)
+    rows = (await db.execute(
+        select(Task.column_id, func.max(Task.position))
+        .filter(Task.column_id.in_(column_ids))
+        .group_by(Task.column_id)
+    )).all()
+    result = dict.fromkeys(column_ids, 0)
+    result.update({column_id: position or 0 for column_id, position in rows})
+    return result
+
+
+async def rebalance_column(db: AsyncSession, column_id: int, gap: int = TASK_POSITION_GAP):
+    """Renumber a column to gap, 2*gap, ... keeping the current order, in one statement."""
+    ranked = (
+        select(Task.id, func.row_number().over(order_by=(Task.position, Task.id)).label("rank"))
+        .filter(Task.column_id == column_id)
+        .subquery()
+    )
+    await db.execute(
+        update(Task)
+        .where(Task.id == ranked.c.id)
+        .values(position=ranked.c.rank * gap)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def rebalance_column_in_background(column_id: int):
+    async with AsyncSessionLocal() as db:
+        await rebalance_column(db, column_id)
+        await db.commit()
+
+
+async def _neighbours(db: AsyncSession, column_id: int, slot: int, exclude_id: Optional[int]):
+    conditions = [Task.column_id == column_id]
+    if exclude_id is not None:
+        conditions.append(Task.id != exclude_id)
+    positions = (await db.scalars(
+        select(Task.position)
+        .filter(*conditions)
+        .order_by(Task.position, Task.id)
+        .offset(max(slot - 2, 0))
+        .limit(2 if slot > 1 else 1)
+    )).all()
+    if slot <= 1:
+        return None, (positions[0] if positions else None)
+    before = positions[0] if positions else None
+    after = positions[1] if len(positions) > 1 else None
+    return before, after
+
+
+def _between(before: Optional[int], after: Optional[int]) -> Optional[int]:
+    if after is None:
+        return (before or 0) + TASK_POSITION_GAP
+    low = before if before is not None else 0
+    if after - low < 2:
+        return None
+    return (low + after) // 2
+
+
+async def gap_position(db: AsyncSession, column_id: int, slot: int, exclude_id: Optional[int] = None):
+    """
+    Sparse position for the given 1-based slot. Returns (position, needs_rebalance).
+    """
+    before, after = await _neighbours(db, column_id, slot, exclude_id)
+    if before is None and slot > 1:
+        # slot is past the end of the column: append, like the dense mode clamps to max+1
+        return await max_position(db, column_id, exclude_id) + TASK_POSITION_GAP, False
+    position = _between(before, after)
+    if position is None:
+        await rebalance_column(db, column_id)
+        before, after = await _neighbours(db, column_id, slot, exclude_id)
+        position = _between(before, after)
+    low = before if before is not None else 0
+    needs_rebalance = after is not None and min(position - low, after - position) < 2
+    return position, needs_rebalance
+
+
+async def move_task(db: AsyncSession, task: Task, target_column_id: int, new_position: Optional[int]) -> bool:
+    """
+    Move `task` to `new_position` in `target_column_id` (append when new_position is None).
+    Returns True when the target column should be rebalanced in the background.
+    """
+    if GAP_MODE:
+        if new_position is None:
+            task.position = await append_position(db, target_column_id)
+            task.column_id = target_column_id
+            return False
+        position, needs_rebalance = await gap_position(db, target_column_id, new_position, exclude_id=task.id)
+        task.position = position
+        task.column_id = target_column_id
+        return needs_rebalance
+
+    if new_position is None:
+        # If only column_id changed without position, append to end of that column
+        max_pos = await max_position(db, target_column_id)
+        # Remove from old column positions
+        await db.execute(_shift_positions(task.column_id, -1, Task.position > (task.position or 0)))
+        task.column_id = target_column_id
+        task.position = max_pos + 1
+        return False
+
+    max_pos = await max_position(db, target_column_id)
+
+    # If moving to a different column, clamp new_position to max+1
+    if target_column_id != task.column_id:
+        # Removing from old column: shift left positions after the old position
+        await db.execute(_shift_positions(task.column_id, -1, Task.position > (task.position or 0)))
+
+        # Insert into new column: clamp new_position
+        if new_position > max_pos + 1:
+            new_position = max_pos + 1
+
+        # Shift tasks at or after new_position in new column to the right
+        await db.execute(_shift_positions(target_column_id, 1, Task.position >= new_position))
+
+        task.position = new_position
+        task.column_id = target_column_id
+    else:
+        # Moving within same column
+        old_position = task.position or 0
+        if new_position != old_position:
+            if new_position > old_position:
+                # shift left tasks between old_position+1 .. new_position
+                await db.execute(_shift_positions(task.column_id, -1, Task.position > old_position, Task.position <= new_position))
+            else:
+                # shift right tasks between new_position .. old_position-1
+                await db.execute(_shift_positions(task.column_id, 1, Task.position >= new_position, Task.position < old_position))
+
+            task.position = new_position
+    return False
+
+
+def plan_moves(rows: Iterable, moves: Iterable) -> dict:
+    """
+    Apply a batch of moves in memory.
+    rows:  (task_id, column_id, position) for every task of the affected columns, ordered by position.
+    moves: (task_id, column_id, slot) applied in order, slot None appends to the column.
+    Returns {task_id: (column_id, position)} for the tasks whose column or position changed, so the
+    caller can write them with one executemany UPDATE.
+    """
+    columns = defaultdict(list)
+    location = {}
+    positions = {}
+    original = {}
+    for task_id, column_id, position in rows:
+        columns[column_id].append(task_id)
+        location[task_id] = column_id
+        positions[task_id] = position
+        original[task_id] = (column_id, position)
+
+    touched = set()
+    for task_id, column_id, slot in moves:
+        touched.add(location[task_id])
+        touched.add(column_id)
+        columns[location[task_id]].remove(task_id)
+        target = columns[column_id]
+        index = len(target) if slot is None else min(slot - 1, len(target))
+        target.insert(index, task_id)
+        location[task_id] = column_id
+
+        if GAP_MODE:
+            before = positions[target[index - 1]] if index > 0 else None
+            after = positions[target[index + 1]] if index + 1 < len(target) else None
+            position = _between(before, after)
+            if position is None:
+                for i, other_id in enumerate(target, start=1):
+                    positions[other_id] = i * TASK_POSITION_GAP
+            else:
+                positions[task_id] = position
+
+    if not GAP_MODE:
+        for column_id in touched:
+            for i, task_id in enumerate(columns[column_id], start=1):
+                positions[task_id] = i
+
+    return {
+        task_id: (location[task_id], positions[task_id])
+        for task_id in positions
+        if (location[task_id], positions[task_id]) != original[task_id]
+    }
@@ -0,0 +1,114 @@
+import hashlib
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.models.token import Token
+from app.env import REVOKED_TOKENS_SYNC_SECONDS, REVOKED_TOKENS_STORE_DIGEST
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def stored_token_value(token: str) -> str:
+    """Value written to revoked_tokens.token for the given JWT."""
+    return token_digest(token) if REVOKED_TOKENS_STORE_DIGEST else token
+
+
+def _row_digest(stored: str) -> str:
+    # A JWT always contains dots, so a 64-char hex value can only be a stored digest.
+    # Handles tables that mix both forms after the storage mode was switched.
+    return stored if _DIGEST_RE.match(stored) else token_digest(stored)
+
+
+def purge_expired_tokens(db: Session) -> int:
+    deleted = (
+        db.query(Token)
+        .filter(Token.valid_until < datetime.utcnow())
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
+
+
+def _as_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class RevokedTokenCache:
+    """
+    In-process copy of the revoked_tokens table keyed by token digest.
+    Entries are dropped once their valid_until has passed (the JWT is expired by then anyway).
+    The cache re-syncs with the database every `sync_interval` seconds so revocations
+    made by other workers are picked up without a query on every request.
+    """
+
+    # rows revoked in concurrent transactions may commit with a slightly older revoked_at
+    SYNC_OVERLAP = timedelta(seconds=30)
+
+    def __init__(self, sync_interval: int = REVOKED_TOKENS_SYNC_SECONDS):
+        self._entries: dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._sync_interval = sync_interval
+        self._next_sync = 0.0
+        self._high_water: Optional[datetime] = None
+
+    def load(self, db: Session):
+        now = datetime.utcnow()
+        rows = db.query(Token.token, Token.valid_until, Token.revoked_at).filter(Token.valid_until > now).all()
+        with self._lock:
+            self._entries = {}
+            self._high_water = None
+            self._merge(rows)
+            self._next_sync = time.monotonic() + self._sync_interval
+
+    def sync(self, db: Session):
+        if time.monotonic() < self._next_sync:
+            return
+        with self._lock:
+            if time.monotonic() < self._next_sync:
+                return
+            self._next_sync = time.monotonic() + self._sync_interval
+            high_water = self._high_water
+
+        query = db.query(Token.token, Token.valid_until, Token.revoked_at).filter(Token.valid_until > datetime.utcnow())
+        if high_water is not None:
+            query = query.filter(Token.revoked_at >= high_water - self.SYNC_OVERLAP)
+        rows = query.all()
+
+        with self._lock:
+            self._merge(rows)
+            self._evict_expired()
+
+    def add(self, token: str, valid_until: datetime):
+        with self._lock:
+            self._entries[token_digest(token)] = _as_naive_utc(valid_until)
+
+    def is_revoked(self, token: str) -> bool:
+        valid_until = self._entries.get(token_digest(token))
+        return valid_until is not None and valid_until > datetime.utcnow()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _merge(self, rows):
+        for token, valid_until, revoked_at in rows:
+            self._entries[_row_digest(token)] = _as_naive_utc(valid_until)
+            if revoked_at is not None and (self._high_water is None or revoked_at > self._high_water):
+                self._high_water = revoked_at
+
+    def _evict_expired(self):
+        now = datetime.utcnow()
+        expired = [digest for digest, valid_until in self._entries.items() if valid_until <= now]
+        for digest in expired:
+            del self._entries[digest]
+
+
+revoked_tokens = RevokedTokenCache()
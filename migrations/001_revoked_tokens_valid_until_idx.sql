@@ -0,0 +1,3 @@
+-- Index used by the revoked-token reaper and the cache sync query.
+-- create_all() does not add indexes to existing tables, run this once on existing databases.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_revoked_tokens_valid_until ON revoked_tokens (valid_until);
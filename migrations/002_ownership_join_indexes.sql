@@ -0,0 +1,6 @@
+-- Indexes for the Task -> Column -> Board -> Project ownership joins and position shifts.
+-- CONCURRENTLY cannot run inside a transaction block, so run this file without --single-transaction.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_column_id_position ON tasks (column_id, position);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_columns_board_id_position ON columns (board_id, position);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_boards_project_id ON boards (project_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_projects_owner_id ON projects (owner_id);
@@ -0,0 +1,2 @@
+-- columns.updated_at feeds the ETag validator of GET /columns/{board_id}.
+ALTER TABLE columns ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now();
@@ -0,0 +1,2 @@
+-- Keyset pagination of /tasks/getall ordered by (due_date, id); ordering by id uses the primary key.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_due_date_id ON tasks (due_date, id);
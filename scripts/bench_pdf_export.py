@@ -0,0 +1,60 @@
+"""
+Render synthetic projects with build_project_pdf and report time and size.
+
+    python -m scripts.bench_pdf_export --sizes 1000 10000 50000
+
+No database is needed, boards/columns/tasks are plain objects. Both the fast table
+mode and the Paragraph-only mode are measured unless --fast-only is given.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from app.services.pdf_service import build_project_pdf
+
+PRIORITIES = ["low", "medium", "high"]
+
+
+def make_project(tasks: int, boards: int = 5, columns_per_board: int = 4, seed: int = 42):
+    rng = random.Random(seed)
+    per_column = max(tasks // (boards * columns_per_board), 1)
+    start = datetime(2025, 1, 1)
+    result = []
+    for b in range(boards):
+        columns = []
+        for c in range(columns_per_board):
+            column_tasks = [
+                SimpleNamespace(
+                    title=f"Task {b}-{c}-{t}",
+                    description=("Lorem ipsum dolor sit amet " * rng.randint(0, 6)).strip() or None,
+                    priority=rng.choice(PRIORITIES),
+                    due_date=start + timedelta(days=rng.randint(0, 365)),
+                    position=t,
+                )
+                for t in range(per_column)
+            ]
+            columns.append(SimpleNamespace(name=f"Column {c}", position=c, tasks=column_tasks))
+        result.append(SimpleNamespace(name=f"Board {b}", description=None, columns=columns))
+    project = SimpleNamespace(name="Benchmark project", description="Synthetic data")
+    return project, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--fast-only", action="store_true")
+    args = parser.parse_args()
+
+    modes = [True] if args.fast_only else [True, False]
+    for size in args.sizes:
+        project, boards = make_project(size)
+        for fast in modes:
+            start = time.perf_counter()
+            buffer = build_project_pdf(project, boards, fast=fast)
+            elapsed = time.perf_counter() - start
+            print(f"{size:>6} tasks  {'fast' if fast else 'paragraph':>9}: {elapsed:7.2f} s  {len(buffer.getvalue()) / 1024:9.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Compare dense and gap task ordering on columns with many tasks.
+
+    python -m scripts.bench_task_ordering --tasks 10000 --moves 200
+
+Runs against the database configured in app.db.database. Every scheme seeds its own
+user/project/board inside a transaction that is rolled back at the end.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import event, insert, select
+from app.db.database import async_engine, AsyncSessionLocal
+from app.models.user import User
+from app.models.project import Project
+from app.models.board import Board
+from app.models.column import ColumnModel
+from app.models.task import Task
+from app.services import task_ordering
+from app.env import TASK_POSITION_GAP
+
+rows_written = 0
+
+
+@event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+def _count_rows(conn, cursor, statement, parameters, context, executemany):
+    global rows_written
+    if statement.lstrip().upper().startswith("UPDATE") and cursor.rowcount > 0:
+        rows_written += cursor.rowcount
+
+
+async def seed(db, tasks_per_column: int, step: int):
+    suffix = uuid.uuid4().hex[:12]
+    user = User(username=f"bench-{suffix}", email=f"bench-{suffix}@example.com", password_hash="-")
+    db.add(user)
+    await db.flush()
+    project = Project(name="bench", owner_id=user.user_id)
+    db.add(project)
+    await db.flush()
+    board = Board(name="bench", project_id=project.public_project_id)
+    db.add(board)
+    await db.flush()
+    columns = [ColumnModel(name=f"column {i}", position=i, board_id=board.id) for i in (1, 2)]
+    db.add_all(columns)
+    await db.flush()
+
+    due = datetime.now(timezone.utc)
+    for column in columns:
+        await db.execute(insert(Task), [
+            {"title": f"task {i}", "position": i * step, "column_id": column.id, "due_date": due}
+            for i in range(1, tasks_per_column + 1)
+        ])
+    return [column.id for column in columns]
+
+
+async def run(scheme: str, tasks_per_column: int, moves: int, seed_value: int):
+    global rows_written
+    task_ordering.GAP_MODE = scheme == "gap"
+    rng = random.Random(seed_value)
+
+    async with AsyncSessionLocal() as db:
+        column_ids = await seed(db, tasks_per_column, TASK_POSITION_GAP if scheme == "gap" else 1)
+        task_ids = (await db.scalars(select(Task.id).filter(Task.column_id.in_(column_ids)))).all()
+
+        rows_written = 0
+        timings = []
+        rebalances = 0
+        for _ in range(moves):
+            task = await db.get(Task, rng.choice(task_ids))
+            target = rng.choice(column_ids)
+            slot = rng.randint(1, tasks_per_column)
+            start = time.perf_counter()
+            if await task_ordering.move_task(db, task, target, slot):
+                await task_ordering.rebalance_column(db, target)
+                rebalances += 1
+            await db.flush()
+            timings.append(time.perf_counter() - start)
+
+        # a slot past the end of the column must append, not jump to the top
+        task = await db.get(Task, rng.choice(task_ids))
+        await task_ordering.move_task(db, task, column_ids[0], tasks_per_column * 3)
+        await db.flush()
+        last_id = await db.scalar(
+            select(Task.id).filter(Task.column_id == column_ids[0]).order_by(Task.position.desc(), Task.id.desc()).limit(1)
+        )
+        assert last_id == task.id, f"{scheme}: move past the end did not append"
+
+        await db.rollback()
+
+    print(
+        f"{scheme:>5}: {moves} moves, "
+        f"mean {statistics.mean(timings) * 1000:.2f} ms, "
+        f"p95 {sorted(timings)[int(len(timings) * 0.95) - 1] * 1000:.2f} ms, "
+        f"rows written/move {rows_written / moves:.1f}, "
+        f"rebalances {rebalances}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=10000, help="tasks per column")
+    parser.add_argument("--moves", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for scheme in ("dense", "gap"):
+        await run(scheme, args.tasks, args.moves, args.seed)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+"""
+Run an export job the way the export pool does: in a freshly spawned interpreter that
+imports nothing but app.services.export_jobs.
+
+    python -m scripts.check_export_worker                      # mapper check only, no database
+    python -m scripts.check_export_worker --project <uuid> --format pdf
+
+Without --project it only checks that the worker can configure every mapper and resolve the
+foreign keys of export_jobs. With --project it creates a job for that project's owner, runs
+run_export_job in the child process and fails unless the job ends as done.
+"""
+import argparse
+import multiprocessing
+import sys
+
+
+def _check_mappers():
+    from sqlalchemy.orm import configure_mappers
+    from app.services.export_jobs import ExportJob
+
+    configure_mappers()
+    for fk in ExportJob.__table__.foreign_keys:
+        fk.column  # raises NoReferencedTableError when the target table is not registered
+
+
+def _run_job(job_id: str):
+    from app.services.export_jobs import run_export_job
+
+    run_export_job(job_id)
+
+
+def _in_fresh_process(target, *args):
+    process = multiprocessing.get_context("spawn").Process(target=target, args=args)
+    process.start()
+    process.join()
+    return process.exitcode
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--project", help="public project id to export")
+    parser.add_argument("--format", default="pdf")
+    parser.add_argument("--board", type=int)
+    args = parser.parse_args()
+
+    if _in_fresh_process(_check_mappers) != 0:
+        sys.exit("mapper check failed in a fresh process")
+    print("mappers and export_jobs foreign keys resolve in a fresh process")
+
+    if args.project is None:
+        return
+
+    from app.db.database import SessionLocal
+    from app.models import ExportJob, Project
+    from app.constant import EXPORT_DONE
+
+    db = SessionLocal()
+    try:
+        project = db.query(Project).filter(Project.public_project_id == args.project).first()
+        if project is None:
+            sys.exit("project not found")
+        job = ExportJob(owner_id=project.owner_id, project_id=project.public_project_id, board_id=args.board, format=args.format)
+        db.add(job)
+        db.commit()
+
+        if _in_fresh_process(_run_job, str(job.job_id)) != 0:
+            sys.exit("run_export_job crashed")
+        db.refresh(job)
+        print(f"job {job.job_id}: {job.status} {job.size or ''} {job.error or ''}")
+        if job.status != EXPORT_DONE:
+            sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()